@@ -0,0 +1,30 @@
+"""Device transport profile field
+
+Revision ID: a7e3c9d1f246
+Revises: f6d4a8b0c235
+Create Date: 2026-10-18 18:42:11.503187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9d1f246'
+down_revision: Union[str, Sequence[str], None] = 'f6d4a8b0c235'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('scales', 'printers'):
+        op.add_column(table, sa.Column('transport', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('scales', 'printers'):
+        op.drop_column(table, 'transport')
@@ -0,0 +1,30 @@
+"""Drop device events order_id
+
+Revision ID: b8f4d2e6a357
+Revises: a7e3c9d1f246
+Create Date: 2026-10-18 19:05:37.214906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f4d2e6a357'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c9d1f246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_device_events_order_id'), table_name='device_events')
+    op.drop_column('device_events', 'order_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('device_events', sa.Column('order_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_device_events_order_id'), 'device_events', ['order_id'], unique=False)
@@ -0,0 +1,47 @@
+"""Device transport profiles
+
+Revision ID: c3a1d5e7b902
+Revises: 97fa17869836
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a1d5e7b902'
+down_revision: Union[str, Sequence[str], None] = '97fa17869836'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PROFILE_COLUMNS = (
+    ('connect_timeout', sa.Float),
+    ('write_timeout', sa.Float),
+    ('read_timeout', sa.Float),
+    ('idle_timeout', sa.Float),
+    ('poll_interval', sa.Float),
+    ('tcp_nodelay', sa.Boolean),
+    ('keepalive_idle', sa.Integer),
+    ('keepalive_interval', sa.Integer),
+    ('keepalive_count', sa.Integer),
+    ('rcv_buffer_size', sa.Integer),
+    ('snd_buffer_size', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('scales', 'printers'):
+        for name, column_type in PROFILE_COLUMNS:
+            op.add_column(table, sa.Column(name, column_type(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('scales', 'printers'):
+        for name, _ in reversed(PROFILE_COLUMNS):
+            op.drop_column(table, name)
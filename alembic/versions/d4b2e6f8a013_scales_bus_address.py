@@ -0,0 +1,49 @@
+"""Scales bus address, tenzo_m_bus driver
+
+Revision ID: d4b2e6f8a013
+Revises: c3a1d5e7b902
+Create Date: 2026-10-18 12:40:11.508127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b2e6f8a013'
+down_revision: Union[str, Sequence[str], None] = 'c3a1d5e7b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DRIVERS_BEFORE = ('tenzo_m', 'mt_sics', 'digi_di160')
+DRIVERS_AFTER = ('tenzo_m', 'tenzo_m_bus', 'mt_sics', 'digi_di160')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scales', sa.Column('address', sa.Integer(), nullable=True))
+    op.create_check_constraint('check_address_range', 'scales', 'address BETWEEN 1 AND 254')
+
+    op.drop_constraint('check_driver_name_valid', 'scales', type_='check')
+    op.create_check_constraint(
+        'check_driver_name_valid',
+        'scales',
+        f"driver_name IN ({', '.join(repr(v) for v in DRIVERS_AFTER)})",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE scales SET driver_name = 'tenzo_m' WHERE driver_name = 'tenzo_m_bus'")
+    op.drop_constraint('check_driver_name_valid', 'scales', type_='check')
+    op.create_check_constraint(
+        'check_driver_name_valid',
+        'scales',
+        f"driver_name IN ({', '.join(repr(v) for v in DRIVERS_BEFORE)})",
+    )
+
+    op.drop_constraint('check_address_range', 'scales', type_='check')
+    op.drop_column('scales', 'address')
@@ -0,0 +1,42 @@
+"""mt_sics_sir driver
+
+Revision ID: e5c3f7a9b124
+Revises: d4b2e6f8a013
+Create Date: 2026-10-18 14:05:37.216540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c3f7a9b124'
+down_revision: Union[str, Sequence[str], None] = 'd4b2e6f8a013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DRIVERS_BEFORE = ('tenzo_m', 'tenzo_m_bus', 'mt_sics', 'digi_di160')
+DRIVERS_AFTER = ('tenzo_m', 'tenzo_m_bus', 'mt_sics', 'mt_sics_sir', 'digi_di160')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('check_driver_name_valid', 'scales', type_='check')
+    op.create_check_constraint(
+        'check_driver_name_valid',
+        'scales',
+        f"driver_name IN ({', '.join(repr(v) for v in DRIVERS_AFTER)})",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE scales SET driver_name = 'mt_sics' WHERE driver_name = 'mt_sics_sir'")
+    op.drop_constraint('check_driver_name_valid', 'scales', type_='check')
+    op.create_check_constraint(
+        'check_driver_name_valid',
+        'scales',
+        f"driver_name IN ({', '.join(repr(v) for v in DRIVERS_BEFORE)})",
+    )
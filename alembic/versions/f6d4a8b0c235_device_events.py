@@ -0,0 +1,43 @@
+"""Device events journal
+
+Revision ID: f6d4a8b0c235
+Revises: e5c3f7a9b124
+Create Date: 2026-10-18 16:20:48.913052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6d4a8b0c235'
+down_revision: Union[str, Sequence[str], None] = 'e5c3f7a9b124'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('device_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('event', sa.String(length=20), nullable=False),
+    sa.Column('ip', postgresql.INET(), nullable=False),
+    sa.Column('port', sa.Integer(), nullable=False),
+    sa.Column('address', sa.Integer(), nullable=True),
+    sa.Column('weight', sa.Float(), nullable=True),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_device_events_created_at'), 'device_events', ['created_at'], unique=False)
+    op.create_index(op.f('ix_device_events_order_id'), 'device_events', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_device_events_order_id'), table_name='device_events')
+    op.drop_index(op.f('ix_device_events_created_at'), table_name='device_events')
+    op.drop_table('device_events')
@@ -1,4 +1,5 @@
 from core.database import AppBaseClass  # noqa
+from events.models import DeviceEventOrm  # noqa
 from items.models import ItemsOrm  # noqa
 from labels.models import LabelTemplateORM #noqa
 from transactions.models import OrderOrm  # noqa
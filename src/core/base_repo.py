@@ -69,9 +69,16 @@ class BaseRepository:
     #     logger.debug(f'Обновление записи в БД: модель={db_obj.__class__.__name__}, id={db_obj.id}')
     #     return db_obj
 
-    async def update(self, session: AsyncSession, obj_id: int, data_input: BaseModel) -> int | None:
-        """Метод изменения существующей записи таблицы, на вход поступает DTO."""
+    async def update(
+        self, session: AsyncSession, obj_id: int, data_input: BaseModel, nullable_fields: set[str] | None = None
+    ) -> int | None:
+        """Метод изменения существующей записи таблицы, на вход поступает DTO.
+
+        Пустые поля DTO не изменяются, кроме перечисленных в nullable_fields - они записываются в том числе как NULL.
+        """
         data_input_dict: dict = data_input.model_dump(exclude_none=True)
+        if nullable_fields:
+            data_input_dict.update(data_input.model_dump(include=nullable_fields))
         stmt = (
             update(self.model)
             .where(self.model.id == obj_id)
@@ -38,6 +38,10 @@ class Settings(BaseSettings):
     LOG_NUMBER_OF_FILES_TO_KEEP: int = 5
     LOG_FILE_MAX_SIZE: str = '1 MB'
 
+    # Каталог данных приложения (архив показаний весов, резервный файл журнала событий).
+    # Относительный путь из окружения считается от текущего каталога и приводится к абсолютному при запуске
+    DATA_DIR_PATH: str = os.path.abspath(os.getenv('DATA_DIR', os.path.join(os.path.dirname(__file__), '../../data')))
+
     # Валидация объектов
 
     ITEM_NAME_MAX_LENGTH: int = 100
@@ -48,6 +52,9 @@ class Settings(BaseSettings):
 
     DEVICE_PORT_MIN: int = 1024
     DEVICE_PORT_MAX: int = 65535
+    # Адрес весов на линии RS-485 (несколько весов за одним преобразователем интерфейса)
+    SCALES_ADDRESS_MIN: int = 1
+    SCALES_ADDRESS_MAX: int = 254
     DEVICE_DESCRIPTION_MAX_LENGTH: int = 255
 
     DRIVER_NAME_MAX_LENGTH: int = 30
@@ -57,17 +64,130 @@ class Settings(BaseSettings):
 
     PROCESS_NAME_MAX_LENGTH: int = 100
 
+    DEVICE_EVENT_NAME_MAX_LENGTH: int = 20
+
     PRINTER_MAX_FONT_IMAGE_FILE_SIZE_BYTES: int = 500_000  # 500 KB
 
     # Коммуникация с устройствами
 
     DEVICE_RESPONSE_SIZE_BYTES: int = 2048
+    DEVICE_RECEIVE_BUFFER_SIZE_BYTES: int = 64 * 1024
 
+    # Таймауты, период опроса и параметры сокета ниже - значения по умолчанию транспортного профиля,
+    # для отдельных устройств переопределяются в справочниках весов и принтеров
     CONNECT_TO_DEVICE_TIMEOUT: int = 2
     CONNECT_TO_DEVICE_ATTEMPTS: int = 3
     DEVICE_POLL_INTERVAL: float = 0.5
+    DEVICE_IDLE_TIMEOUT: int = 300
+    DEVICE_TCP_NODELAY: bool = True
     # WAIT_FOR_DEVICE_RESPONSE_TIMEOUT: int = 2
 
+    # TCP keepalive для обнаружения полуоткрытых соединений в пуле, секунды/количество проб
+    DEVICE_TCP_KEEPALIVE_IDLE: int = 10
+    DEVICE_TCP_KEEPALIVE_INTERVAL: int = 3
+    DEVICE_TCP_KEEPALIVE_COUNT: int = 3
+
+    # Общий бюджет времени на обмен с устройством для запросов веб-интерфейса и API, секунды.
+    # Подключение, отправка и ожидание ответа вместе укладываются в этот бюджет
+    DEVICE_REQUEST_DEADLINE: float = 5
+    DEVICE_UPLOAD_DEADLINE: float = 30
+
+    # Переподключение потока веса при потере связи: экспоненциальная задержка, секунды
+    STREAM_RECONNECT_BACKOFF_BASE: float = 0.5
+    STREAM_RECONNECT_BACKOFF_MAX: float = 5.0
+
+    # Отправка потока веса подписчику: минимальное изменение веса (кг), максимальная частота (сообщений/с),
+    # период повтора последнего показания при неизменном весе (с); сколько неотправленных событий и ошибок
+    # потока хранится для подписчика (события не прореживаются, при переполнении теряются самые старые)
+    SCALES_STREAM_MIN_DELTA: float = 0.001
+    SCALES_STREAM_MAX_RATE: float = 10
+    SCALES_STREAM_HEARTBEAT: float = 5
+    SCALES_STREAM_EVENTS_QUEUE_SIZE: int = 100
+
+    # Поток веса через Server-Sent Events: период комментария keepalive при отсутствии сообщений (с),
+    # задержка переподключения клиента EventSource (мс)
+    SCALES_SSE_KEEPALIVE: float = 15
+    SCALES_SSE_RETRY: int = 2000
+
+    # Определение успокоения веса на сервере: цена деления (кг), допуск (делений), окно и время удержания (с),
+    # размер медианного фильтра (1 - без фильтра). При выключенном определении используется признак от весов
+    SCALES_STABILITY_ENABLED: bool = True
+    SCALES_DIVISION: float = 0.001
+    SCALES_STABILITY_TOLERANCE_DIVISIONS: int = 2
+    SCALES_STABILITY_WINDOW: float = 0.5
+    SCALES_STABILITY_DWELL: float = 0.3
+    SCALES_STABILITY_MEDIAN_SIZE: int = 3
+
+    # Цикл взвешивания: вес (кг), с которого платформа считается нагруженной; платформа считается разгруженной
+    # ниже SCALES_EMPTY_THRESHOLD. Размер очереди событий подписчика (при переполнении теряются старые события)
+    SCALES_CYCLE_LOAD_THRESHOLD: float = 0.02
+    SCALES_CYCLE_EVENTS_QUEUE_SIZE: int = 100
+
+    # История показаний: размер кольцевого буфера последних показаний одних весов
+    # (при 10 показаниях в секунду 6000 - последние 10 минут, около 100 КБ на весы)
+    # и максимальная глубина запроса истории, секунды
+    SCALES_HISTORY_SIZE: int = 6000
+    SCALES_HISTORY_MAX_SECONDS: float = 3600
+
+    # Архив показаний весов на диске: каталог, период записи накопленных показаний (с), срок хранения (сутки),
+    # максимальное число записей в ответе на запрос архива
+    SCALES_ARCHIVE_ENABLED: bool = False
+    SCALES_ARCHIVE_DIR_PATH: str = os.path.join(DATA_DIR_PATH, 'scales')
+    SCALES_ARCHIVE_FLUSH_INTERVAL: float = 5
+    SCALES_ARCHIVE_RETENTION_DAYS: int = 90
+    SCALES_ARCHIVE_MAX_POINTS: int = 100_000
+
+    # Журнал событий устройств (циклы взвешивания, печать этикеток) в БД: запись пачками через COPY.
+    # Размер пачки, максимальное ожидание события в буфере (с), максимальный размер буфера,
+    # таймаут записи пачки (с), резервный файл для событий, которые не удалось записать в БД,
+    # и период повторного переноса резервного файла в БД при простое (с)
+    EVENTS_PERSIST_ENABLED: bool = False
+    EVENTS_BATCH_SIZE: int = 500
+    EVENTS_FLUSH_INTERVAL: float = 2
+    EVENTS_BUFFER_MAX_SIZE: int = 10_000
+    EVENTS_COPY_TIMEOUT: float = 10
+    EVENTS_SPOOL_FILE_PATH: str = os.path.join(DATA_DIR_PATH, 'events_spool.jsonl')
+    EVENTS_SPOOL_RETRY_INTERVAL: float = 30
+
+    # Окно свежести разового показания веса: запросы веса в пределах окна получают последнее показание
+    # без обращения к весам, секунды (0 - только объединение одновременных запросов)
+    SCALES_WEIGHT_FRESHNESS_WINDOW: float = 0.2
+
+    # Фоновый мониторинг весов: постоянное чтение всех весов из справочника и кэш последних показаний.
+    # Разовый запрос веса отдается из кэша, если показание не старше SCALES_MONITOR_MAX_AGE секунд
+    # (значение должно быть больше периода опроса пустой платформы SCALES_POLL_IDLE_INTERVAL)
+    SCALES_MONITOR_ENABLED: bool = False
+    SCALES_MONITOR_MAX_AGE: float = 3.0
+
+    # Одновременный опрос нескольких весов (снимок показаний): число одновременно опрашиваемых весов
+    # и бюджет времени на опрос одних весов, секунды
+    SCALES_SNAPSHOT_CONCURRENCY: int = 16
+    SCALES_SNAPSHOT_DEVICE_DEADLINE: float = 3
+
+    # Адаптивный опрос весов в режиме pull: период при грузе на платформе или изменении веса и период
+    # при пустой платформе, секунды; вес (кг), ниже которого платформа считается пустой.
+    # Пустая платформа опрашивается с периодом от poll_interval профиля до SCALES_POLL_IDLE_INTERVAL
+    SCALES_POLL_FAST_INTERVAL: float = 0.1
+    SCALES_POLL_IDLE_INTERVAL: float = 2.0
+    SCALES_EMPTY_THRESHOLD: float = 0.005
+
+    # Пул соединений: лимиты открытых сокетов на процесс и на один IP (шлюзы RS-232/Ethernet держат 1-2 сокета),
+    # ожидание свободного места в очереди и период проверки неиспользуемых соединений, секунды
+    DEVICE_MAX_CONNECTIONS: int = 512
+    DEVICE_MAX_CONNECTIONS_PER_HOST: int = 8
+    DEVICE_CONNECTION_QUEUE_TIMEOUT: float = 10
+    DEVICE_IDLE_REAPER_INTERVAL: float = 30
+
+    # Предохранитель недоступных устройств: порог неудачных подключений и экспоненциальная задержка проб, секунды
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 1
+    DEVICE_BACKOFF_BASE: float = 1.0
+    DEVICE_BACKOFF_MAX: float = 60.0
+
+    # Прогрев соединений при старте и ожидание текущих команд при остановке приложения, секунды
+    DEVICE_PREWARM_ON_STARTUP: bool = True
+    DEVICE_PREWARM_TIMEOUT: int = 10
+    DEVICE_SHUTDOWN_DRAIN_TIMEOUT: int = 5
+
     # Сообщения пользователю
 
     MESSAGE_ENTRY_DOESNT_EXIST: str = 'Запрошенная запись не существует'
@@ -85,6 +205,11 @@ class Settings(BaseSettings):
     MESSAGE_DRIVER_NOT_FOUND: str = 'Драйвер для данного устройства не найден'
     MESSAGE_CONNECTION_SUCCESSFUL: str = 'Соединение с устройством успешно установлено'
     MESSAGE_CONNECTION_FAILED: str = 'Не удалось установить соединение с устройством'
+    MESSAGE_CONNECTION_CLOSED_BY_DEVICE: str = 'Устройство закрыло соединение'
+    MESSAGE_DEVICE_UNAVAILABLE: str = 'Устройство недоступно'
+    MESSAGE_CONNECTION_POOL_EXHAUSTED: str = 'Превышен лимит открытых соединений с устройствами'
+    MESSAGE_STREAM_RECONNECTING: str = 'Нет связи с весами, переподключение'
+    MESSAGE_STREAM_RESUMED: str = 'Связь с весами восстановлена'
     MESSAGE_ERROR_DECODING_DEVICE_RESPONSE: str = 'Не удалось преобразовать ответ устройства'
 
 
@@ -1,7 +1,8 @@
 from typing import AsyncGenerator, Protocol, TypeVar
 
+from sqlalchemy import Boolean, Float, Integer, String
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
 
 from core.config import settings as s
 
@@ -14,6 +15,26 @@ class PreBase:
 AppBaseClass = declarative_base(cls=PreBase)
 
 
+class DeviceProfileMixin:
+    """Поля транспортного профиля устройства (весов, принтера).
+
+    Пустое значение означает настройку по умолчанию из конфигурации приложения.
+    """
+    connect_timeout: Mapped[float | None] = mapped_column(Float, nullable=True)
+    write_timeout: Mapped[float | None] = mapped_column(Float, nullable=True)
+    read_timeout: Mapped[float | None] = mapped_column(Float, nullable=True)
+    idle_timeout: Mapped[float | None] = mapped_column(Float, nullable=True)
+    poll_interval: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    tcp_nodelay: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    keepalive_idle: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    keepalive_interval: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    keepalive_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rcv_buffer_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    snd_buffer_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    transport: Mapped[str | None] = mapped_column(String(20), nullable=True)
+
+
 class ORMBase(Protocol):
     """Базовый класс для корректной проверки типов."""
     id: int
@@ -1,8 +1,41 @@
-from fastapi import Request
+from fastapi import Form, Request
 
 from core.log import logger
 
+from device_drivers.validators import DeviceTransports
+
 
 def logging_dependency(request: Request) -> None:
     """Логируем обращение к эндпоинту."""
     logger.info(f'Обращение {request.method}:{request.url}')
+
+
+def device_profile_form(
+    connect_timeout: float | None = Form(None),
+    write_timeout: float | None = Form(None),
+    read_timeout: float | None = Form(None),
+    idle_timeout: float | None = Form(None),
+    poll_interval: float | None = Form(None),
+    tcp_nodelay: bool | None = Form(None),
+    keepalive_idle: int | None = Form(None),
+    keepalive_interval: int | None = Form(None),
+    keepalive_count: int | None = Form(None),
+    rcv_buffer_size: int | None = Form(None),
+    snd_buffer_size: int | None = Form(None),
+    transport: DeviceTransports | None = Form(None),
+) -> dict:
+    """Собираем поля транспортного профиля устройства из формы. Валидация - в сервисном слое."""
+    return {
+        'connect_timeout': connect_timeout,
+        'write_timeout': write_timeout,
+        'read_timeout': read_timeout,
+        'idle_timeout': idle_timeout,
+        'poll_interval': poll_interval,
+        'tcp_nodelay': tcp_nodelay,
+        'keepalive_idle': keepalive_idle,
+        'keepalive_interval': keepalive_interval,
+        'keepalive_count': keepalive_count,
+        'rcv_buffer_size': rcv_buffer_size,
+        'snd_buffer_size': snd_buffer_size,
+        'transport': transport,
+    }
@@ -0,0 +1,90 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+
+from core.config import settings as s
+from core.database import AsyncSessionLocal
+from core.log import logger
+
+from device_drivers.base import BaseDeviceDriver
+from device_drivers.drivers import get_printer_driver
+from device_drivers.manager import device_manager
+
+from events.buffer import events_buffer
+from printers.service import printers_service
+from scales.archive import scales_archive
+from scales.hub import scales_stream_hub
+from scales.monitor import scales_monitor
+from scales.service import scales_service
+
+
+async def get_configured_devices() -> list[tuple[BaseDeviceDriver, str, int]]:
+    """Получаем из БД все весы и принтеры в виде списка (драйвер, host, port)."""
+    async with AsyncSessionLocal() as session:
+        all_scales = await scales_service.get_all(session)
+        all_printers = await printers_service.get_all(session)
+
+    devices = [(scales.driver, scales.ip.compressed, scales.port) for scales in all_scales]
+
+    for printer in all_printers:
+        driver = get_printer_driver(printer.driver_name)
+        if driver is not None:
+            devices.append((driver, printer.ip.compressed, printer.port))
+
+    return devices
+
+
+async def load_device_profiles() -> None:
+    """Загружаем из БД транспортные профили весов и принтеров в реестр драйверов."""
+    async with AsyncSessionLocal() as session:
+        await scales_service.load_profiles(session)
+        await printers_service.load_profiles(session)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Жизненный цикл приложения.
+
+    При старте загружаем транспортные профили устройств и прогреваем соединения с ними,
+    чтобы первая этикетка смены не ждала подключения. Запускаем включенные фоновые службы:
+    запись журнала событий, архив показаний и мониторинг весов.
+    При остановке дожидаемся текущих команд, дописываем журнал и архив и закрываем соединения.
+    """
+    try:
+        await load_device_profiles()
+    except Exception as e:
+        logger.error(f'❌  Не удалось загрузить профили устройств, действуют настройки по умолчанию: {str(e)}')
+
+    device_manager.start()
+
+    if s.DEVICE_PREWARM_ON_STARTUP:
+        try:
+            devices = await get_configured_devices()
+            await device_manager.prewarm(devices)
+        except Exception as e:
+            logger.error(f'❌  Не удалось прогреть соединения с устройствами: {str(e)}')
+
+    if s.EVENTS_PERSIST_ENABLED:
+        events_buffer.start()
+
+    if s.SCALES_ARCHIVE_ENABLED:
+        scales_archive.start()
+
+    if s.SCALES_MONITOR_ENABLED:
+        try:
+            async with AsyncSessionLocal() as session:
+                await scales_monitor.sync(await scales_service.get_all(session))
+        except Exception as e:
+            logger.error(f'❌  Не удалось запустить мониторинг весов: {str(e)}')
+
+    yield
+
+    # Соединения с устройствами закрываются, даже если остановка фоновых служб завершилась ошибкой
+    try:
+        await scales_monitor.stop()
+        await scales_stream_hub.stop_all()
+        await scales_archive.stop()
+        await events_buffer.stop()
+    finally:
+        await device_manager.shutdown()
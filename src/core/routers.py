@@ -5,6 +5,7 @@ from core.config import settings as s
 from frontend.views import web_root_router
 
 from items.api_views import api_items_router
+from scales.api_views import api_scales_router
 from transactions.api_views import api_orders_router
 
 from items.views import items_router
@@ -18,6 +19,7 @@ api_router = APIRouter(prefix=s.API_URL_PREFIX)
 
 api_router.include_router(api_items_router, prefix='/items', tags=['items'])
 api_router.include_router(api_orders_router, prefix='/orders', tags=['orders'])
+api_router.include_router(api_scales_router, prefix='/scales', tags=['scales'])
 
 web_router = APIRouter(prefix=s.WEB_URL_PREFIX)
 
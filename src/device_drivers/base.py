@@ -1,57 +1,123 @@
 import asyncio
-from typing import Awaitable, Callable
+from typing import Callable
 
 from core.log import L, logger
 from core.config import settings as s
 
-from device_drivers.connections import tcp_connection
+from device_drivers.connections import DeviceReader, DeviceWriter, tcp_connection
+from device_drivers.deadline import is_exhausted, remaining
+from device_drivers.framers import Framer, RawFramer
+from device_drivers.profiles import device_profiles
 from device_drivers.validators import ResponseTypes, DeviceResponse, NotImplementedClass
-from device_drivers.utils import read_fixed_length
 
 
 class BaseDeviceDriver(NotImplementedClass):
-    """Базовый класс драйверов конечных устройств."""
+    """Базовый класс драйверов конечных устройств.
+
+    Обмен с каждым устройством идет через эксклюзивный канал: блокировка по (host, port)
+    общая для всех драйверов (хранится в пуле соединений), поэтому команды веб-интерфейса, API и фоновых задач
+    к одному устройству выполняются по очереди и не перемешивают фреймы в сокете.
+
+    Таймауты обмена и параметры сокета берутся из транспортного профиля устройства (device_profiles)
+    и ограничиваются оставшимся бюджетом времени вызывающей стороны (device_drivers.deadline).
+
+    Атрибуты:
+        _framer_factory - Фабрика фреймера: порядок выделения фреймов из потока байт устройства
+    """
     def __init__(self) -> None:
         super().__init__()
-        self._frame_reader_func: Callable[[asyncio.StreamReader], Awaitable[bytes]] = read_fixed_length
+        self._framer_factory: Callable[[], Framer] = RawFramer
+
+    def _device_lock(self, host: str, port: int) -> asyncio.Lock:
+        """Возвращаем блокировку канала обмена с устройством."""
+        return tcp_connection.lock(host, port)
 
-    async def _create_connection(self, host: str, port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
-        """Получаем TCP соединение или создаем новое."""
-        reader, writer = await tcp_connection.get_or_create(host, port)
+    async def _create_connection(self, host: str, port: int, discard_stale: bool = True) -> tuple[DeviceReader, DeviceWriter]:
+        """Получаем TCP соединение из пула или создаем новое.
+
+        discard_stale=False - не отбрасываем данные, оставшиеся в соединении от предыдущих обменов.
+        """
+        transport = device_profiles.get(host, port).transport
+        reader, writer = await tcp_connection.get_or_create(host, port, transport, discard_stale)
         return reader, writer
 
     async def _close_connection(self, host: str, port: int) -> None:
         """Закрываем TCP соединение."""
         await tcp_connection.close(host, port)
 
-    async def _send(self, host: str, port: int, command: bytes, writer: asyncio.StreamWriter) -> None:
+    async def _send(self, host: str, port: int, command: bytes, writer: DeviceWriter) -> None:
         """Отправляем пакет на устройство по TCP."""
         if command:
             writer.write(command)
             await asyncio.wait_for(
-                writer.drain(), timeout=s.CONNECT_TO_DEVICE_TIMEOUT)
+                writer.drain(), timeout=remaining(device_profiles.get(host, port).write_timeout))
 
             command_cut = command if len(command) < 50 else f'{command[:30]}...{command[-30:]}'
             logger.log(L.TCP, f'🡲  {host}:{port}: {command_cut}')
 
-    async def _receive(self, host: str, port: int, reader: asyncio.StreamReader) -> bytes:
-        """Получаем ответ от устройства по TCP."""
+    async def _receive(self, host: str, port: int, reader: DeviceReader) -> bytes:
+        """Получаем ответ от устройства по TCP.
+
+        Фрейм выделяет фреймер соединения: если к моменту чтения пришло несколько фреймов, отдается самый свежий.
+        """
+        framer = tcp_connection.framer(host, port, self._framer_factory)
         response = await asyncio.wait_for(
-            self._frame_reader_func(reader),
-            timeout=s.CONNECT_TO_DEVICE_TIMEOUT)
+            framer.read_frame(reader),
+            timeout=remaining(device_profiles.get(host, port).read_timeout))
 
+        tcp_connection.touch(host, port)
         logger.log(L.TCP, f'🡰  {host}:{port}: {response}')
         return response
 
+    async def _exchange(self, host: str, port: int, command_bytes: bytes, wait_response: bool) -> bytes | None:
+        """Отправляем команду через соединение из пула и при необходимости читаем ответ.
+
+        Весь обмен (команда и ответ на нее) выполняется под блокировкой устройства.
+        Соединение после успешного обмена остается открытым для следующих команд.
+        При ошибке соединение закрывается, так как его состояние неизвестно.
+        Если переиспользованное соединение оказалось разорвано устройством, однократно повторяем обмен на новом.
+        """
+        async with self._device_lock(host, port):
+            return await self._exchange_locked(host, port, command_bytes, wait_response)
+
+    async def _exchange_locked(self, host: str, port: int, command_bytes: bytes, wait_response: bool) -> bytes | None:
+        """Реализуем обмен с устройством. Вызывается только под блокировкой устройства."""
+        last_error: Exception | None = None
+
+        for attempt in range(2):
+            reused: bool = tcp_connection.is_open(host, port)
+
+            try:
+                reader, writer = await self._create_connection(host, port)
+                await self._send(host, port, command_bytes, writer)
+                return await self._receive(host, port, reader) if wait_response else None
+
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                await self._close_connection(host, port)
+
+                if reused and attempt == 0 and not is_exhausted():
+                    logger.warning(f'⚠️  Соединение с {host}:{port} разорвано, повторяем на новом: {str(e)}')
+                    last_error = e
+                    continue
+
+                raise
+
+            except (Exception, asyncio.CancelledError):
+                # Обмен прерван на середине, в сокете может остаться часть ответа
+                await self._close_connection(host, port)
+                raise
+
+        # Недостижимо: вторая попытка либо возвращает ответ, либо выбрасывает исключение
+        raise last_error
+
     async def _send_workflow(self, host: str, port: int, command_bytes: bytes) -> None:
         """Реализуем цикл отправки команды на устройство, без ожидания ответа.
 
-        1. Получаем TCP соединение или создаем новое
+        1. Получаем TCP соединение из пула или создаем новое
         2. Отправляем команду на устройство
         """
         try:
-            _, writer = await self._create_connection(host, port)
-            await self._send(host, port, command_bytes, writer)
+            await self._exchange(host, port, command_bytes, wait_response=False)
 
         except asyncio.TimeoutError:
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {s.MESSAGE_DEVICE_RESPONSE_TIMEOUT}')
@@ -61,22 +127,17 @@ class BaseDeviceDriver(NotImplementedClass):
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {str(e)}')
             raise
 
-        finally:
-            await self._close_connection(host, port)
-
     async def _send_and_receive_workflow(self, host: str, port: int, command_bytes: bytes) -> bytes:
         """Реализуем однократную отправку команды на устройство и получение ответа.
 
-        1. Получаем TCP соединение или создаем новое
+        1. Получаем TCP соединение из пула или создаем новое
         2. Отправляем команду на устройство (если передана)
         3. Получаем ответ от устройства, возвращаем
 
         Если команда запроса веса не указана, пропускаем шаг отправки команды.
         """
         try:
-            reader, writer = await self._create_connection(host, port)
-            await self._send(host, port, command_bytes, writer)
-            response_bytes: bytes = await self._receive(host, port, reader)
+            response_bytes: bytes = await self._exchange(host, port, command_bytes, wait_response=True)
             return response_bytes
 
         except asyncio.TimeoutError:
@@ -87,19 +148,30 @@ class BaseDeviceDriver(NotImplementedClass):
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {str(e)}')
             raise
 
-        finally:
-            await self._close_connection(host, port)
+    @classmethod
+    async def drain(cls) -> None:
+        """Дожидаемся завершения текущих обменов со всеми устройствами.
+
+        Время ожидания ограничивает вызывающий код (asyncio.timeout).
+        """
+        async def wait_released(lock: asyncio.Lock) -> None:
+            async with lock:
+                pass
+
+        await asyncio.gather(*(wait_released(lock) for lock in tcp_connection.busy_locks()))
 
     async def test_connection(self, host: str, port: int) -> DeviceResponse:
         """Проверяем доступность устройства по TCP."""
+        return await self.open_connection(host, port)
+
+    async def open_connection(self, host: str, port: int) -> DeviceResponse:
+        """Открываем соединение с устройством (или проверяем имеющееся в пуле), без обмена командами."""
         try:
-            # Пытаемся создать соединение
-            await self._create_connection(host, port)
+            # Пытаемся получить исправное соединение из пула или создать новое
+            async with self._device_lock(host, port):
+                await self._create_connection(host, port)
             return DeviceResponse(ok=True, type=ResponseTypes.info, data=None, message=s.MESSAGE_CONNECTION_SUCCESSFUL)
 
         except Exception as e:
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {str(e)}')
             return DeviceResponse(ok=False, type=ResponseTypes.info, data=None, message=str(e))
-
-        finally:
-            await self._close_connection(host, port)
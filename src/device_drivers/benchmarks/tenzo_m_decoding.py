@@ -0,0 +1,104 @@
+import time
+from typing import Callable
+
+import numpy as np
+
+from core.log import logger
+
+from device_drivers.scales.tenzo_m.bulk import decode_frames, find_frames
+from device_drivers.scales.tenzo_m.utils import (
+    BCD_TABLE, FRAME_SIZE, FRAME_SYNC, _compute_crc, _crc_step, decode_response, generate_random_weight_response, is_valid_frame,
+)
+
+FRAMES = 100_000
+REPEATS = 3
+
+
+def compute_crc_bitwise(data: bytes) -> int:
+    """Эталон: CRC побитовым циклом (8 итераций на байт), как до перехода на таблицу."""
+    crc = 0x00
+    for b in data:
+        crc = _crc_step(b, crc)
+    return _crc_step(0x00, crc)
+
+
+def decode_bcd_formatted(w0: int, w1: int, w2: int) -> int:
+    """Эталон: BCD через форматирование строки, как до перехода на таблицу."""
+    return int(f'{w2:02X}{w1:02X}{w0:02X}')
+
+
+def decode_bcd_table(w0: int, w1: int, w2: int) -> int:
+    """BCD по таблице, как в decode_response."""
+    return BCD_TABLE[w2] * 10000 + BCD_TABLE[w1] * 100 + BCD_TABLE[w0]
+
+
+def find_frames_scalar(data: bytes) -> list[int]:
+    """Эталон: поштучный поиск фреймов в потоке, как у FixedLengthFramer, возвращаем смещения фреймов."""
+    offsets = []
+    start = 0
+
+    while (start := data.find(FRAME_SYNC, start)) >= 0 and start + FRAME_SIZE <= len(data):
+        frame = data[start:start + FRAME_SIZE]
+        if is_valid_frame(frame) and decode_response(frame) is not None:
+            offsets.append(start)
+            start += FRAME_SIZE
+        else:
+            start += 1
+
+    return offsets
+
+
+def measure(name: str, func: Callable[..., object], *args: object) -> float:
+    """Замеряем лучшее из REPEATS время выполнения, выводим пропускную способность."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started_at = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started_at)
+
+    logger.info(f'{name:>28}: {FRAMES / best:>14,.0f} фреймов/с, {best * 1e6 / FRAMES:.3f} мкс/фрейм')
+    return best
+
+
+def main() -> None:
+    """Сравнение побитового и табличного CRC, строкового и табличного BCD, поштучного и пакетного разбора.
+
+    Запуск из каталога src: python -m device_drivers.benchmarks.tenzo_m_decoding
+    """
+    frames = [generate_random_weight_response(0, 2000) for _ in range(FRAMES)]
+    capture = b''.join(frames)
+    noisy_capture = b''.join(b'\x00\xFF' + frame if i % 10 == 0 else frame for i, frame in enumerate(frames))
+    # Фреймы с общим байтом 0xFF (конец одного - начало следующего): соседние кандидаты перекрываются цепочкой
+    chained_capture = frames[0] + b''.join(frame[1:] for frame in frames[1:1000])
+
+    # Табличные реализации обязаны совпадать с эталонными
+    assert all(compute_crc_bitwise(frame[1:7]) == _compute_crc(frame[1:7]) for frame in frames[:1000])
+    assert all(decode_bcd_formatted(f[3], f[4], f[5]) == decode_bcd_table(f[3], f[4], f[5]) for f in frames[:1000])
+    bulk = decode_frames(capture)
+    assert bulk.valid.all()
+    assert np.allclose(bulk.weight, [decode_response(frame).weight for frame in frames])
+    offsets, found = find_frames(noisy_capture)
+    assert len(offsets) == FRAMES and np.allclose(found.weight, bulk.weight)
+    # Пакетный поиск обязан находить те же фреймы, что и поштучный
+    for data in (noisy_capture[:100_000], chained_capture, noisy_capture[:50_000] + chained_capture):
+        assert find_frames(data)[0].tolist() == find_frames_scalar(data)
+
+    logger.info('CRC')
+    bitwise = measure('побитовый цикл', lambda: [compute_crc_bitwise(frame[1:7]) for frame in frames])
+    table = measure('таблица', lambda: [_compute_crc(frame[1:7]) for frame in frames])
+    logger.info(f'{"ускорение":>28}: x{bitwise / table:.1f}')
+
+    logger.info('BCD')
+    formatted = measure('форматирование строки', lambda: [decode_bcd_formatted(f[3], f[4], f[5]) for f in frames])
+    table = measure('таблица', lambda: [decode_bcd_table(f[3], f[4], f[5]) for f in frames])
+    logger.info(f'{"ускорение":>28}: x{formatted / table:.1f}')
+
+    logger.info('Разбор фреймов')
+    single = measure('decode_response по одному', lambda: [decode_response(frame) for frame in frames])
+    batch = measure('decode_frames (NumPy)', decode_frames, capture)
+    measure('find_frames (NumPy, с мусором)', find_frames, noisy_capture)
+    logger.info(f'{"ускорение":>28}: x{single / batch:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import tracemalloc
+
+from core.log import logger
+
+from device_drivers.framers import DelimiterFramer
+from device_drivers.scales.digi.utils import decode_response, is_valid_frame
+from device_drivers.transports import open_buffered_connection
+
+HOST = '127.0.0.1'
+PORT = 9998
+
+FRAMES = 200_000
+FRAMES_PER_CHUNK = 64
+FRAME = b'001.234\r000.000\r\n'
+
+
+async def push_frames(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Сервер: отдаем клиенту FRAMES кадров DIGI пачками, как весы в режиме push на высокой частоте."""
+    chunk = FRAME * FRAMES_PER_CHUNK
+
+    for _ in range(FRAMES // FRAMES_PER_CHUNK):
+        writer.write(chunk)
+        await writer.drain()
+
+    writer.close()
+
+
+async def read_frames(transport: str, decode: bool) -> None:
+    """Клиент: читаем (и декодируем) все кадры через выбранный транспорт и фреймер драйвера DIGI."""
+    if transport == 'buffered':
+        reader, writer = await open_buffered_connection(HOST, PORT)
+    else:
+        reader, writer = await asyncio.open_connection(HOST, PORT)
+
+    framer = DelimiterFramer(b'\r\n', is_valid_frame)
+    received = 0
+
+    while received < FRAMES // FRAMES_PER_CHUNK * FRAMES_PER_CHUNK:
+        frames = await framer.read_frames(reader)
+        received += len(frames)
+        if decode:
+            for frame in frames:
+                decode_response(frame)
+
+    writer.close()
+
+
+async def run(transport: str, decode: bool, trace_memory: bool) -> tuple[float, int]:
+    """Замеряем время чтения и пиковую память для одного транспорта."""
+    server = await asyncio.start_server(push_frames, HOST, PORT)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    started_at = time.perf_counter()
+    await read_frames(transport, decode)
+    elapsed = time.perf_counter() - started_at
+
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    server.close()
+    await server.wait_closed()
+    return elapsed, peak
+
+
+async def main() -> None:
+    """Сравнение транспорта StreamReader и BufferedProtocol на потоке кадров весов.
+
+    Запуск из каталога src: python -m device_drivers.benchmarks.transport
+    Время замеряется отдельно от памяти, так как tracemalloc сильно замедляет выполнение.
+    """
+    for decode in (False, True):
+        logger.info('Чтение и декодирование кадров' if decode else 'Только чтение кадров')
+
+        for transport in ('stream', 'buffered'):
+            elapsed, _ = await run(transport, decode, trace_memory=False)
+            _, peak = await run(transport, decode, trace_memory=True)
+            logger.info(
+                f'{transport:>8}: {FRAMES / elapsed:,.0f} кадров/с, '
+                f'{elapsed * 1e6 / FRAMES:.2f} мкс/кадр, пик памяти {peak / 1024:.0f} КБ'
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
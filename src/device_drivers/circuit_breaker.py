@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import random
+import time
+from enum import StrEnum
+from typing import Awaitable, Callable
+
+from core.config import settings as s
+from core.log import L, logger
+
+
+class CircuitStates(StrEnum):
+    """Состояния предохранителя устройства.
+
+    closed - устройство доступно, запросы проходят
+    open - устройство недоступно, запросы сразу завершаются ошибкой, в фоне ждем пробы
+    half_open - идет пробное подключение к устройству
+    """
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half_open'
+
+
+class DeviceUnavailable(Exception):
+    """Исключение - устройство недоступно, предохранитель разомкнут."""
+    pass
+
+
+def backoff_delay(attempt: int, base: float = s.DEVICE_BACKOFF_BASE, maximum: float = s.DEVICE_BACKOFF_MAX) -> float:
+    """Рассчитываем экспоненциальную задержку перед попыткой с номером attempt (с 1).
+
+    Половина задержки фиксирована, половина случайна (jitter),
+    чтобы множество устройств/клиентов не переподключалось синхронно.
+    """
+    delay = min(base * 2 ** max(attempt - 1, 0), maximum)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Предохранитель (circuit breaker) одного устройства.
+
+    После s.CIRCUIT_BREAKER_FAILURE_THRESHOLD неудачных подключений подряд размыкается:
+    запросы к устройству сразу завершаются DeviceUnavailable без попыток подключения.
+    Фоновая проба с экспоненциальной задержкой проверяет устройство и замыкает предохранитель,
+    как только устройство снова отвечает.
+    """
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.state: CircuitStates = CircuitStates.closed
+        self.failures: int = 0
+        self.retry_at: float = 0.0
+        self._probe_task: asyncio.Task | None = None
+
+    def check(self) -> None:
+        """Пропускаем запрос к устройству или сразу отказываем, если предохранитель разомкнут."""
+        if self.state == CircuitStates.closed:
+            return
+
+        retry_in = max(self.retry_at - time.monotonic(), 0)
+        raise DeviceUnavailable(f'{s.MESSAGE_DEVICE_UNAVAILABLE}. Повторная проверка связи через {retry_in:.1f} с')
+
+    def record_success(self) -> None:
+        """Фиксируем успешное подключение - замыкаем предохранитель."""
+        if self.state != CircuitStates.closed:
+            logger.log(L.TCP, f'🟢 Связь с устройством {self.host}:{self.port} восстановлена')
+
+        self.state = CircuitStates.closed
+        self.failures = 0
+
+    def record_failure(self, probe: Callable[[], Awaitable[None]]) -> None:
+        """Фиксируем неудачное подключение, при превышении порога размыкаем предохранитель.
+
+        probe - функция пробного подключения к устройству, вызывается в фоне.
+        """
+        self.failures += 1
+
+        if self.state == CircuitStates.closed and self.failures >= s.CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            self.state = CircuitStates.open
+            self.retry_at = time.monotonic() + backoff_delay(self.failures)
+            logger.warning(f'🔴 Устройство {self.host}:{self.port} недоступно, запросы к нему приостановлены')
+            # Проба живет дольше запроса, на котором разомкнулся предохранитель:
+            # запускаем ее в чистом контексте, без бюджета времени этого запроса
+            self._probe_task = asyncio.create_task(self._probe_loop(probe), context=contextvars.Context())
+
+    async def _probe_loop(self, probe: Callable[[], Awaitable[None]]) -> None:
+        """Пробуем подключиться к устройству с нарастающей задержкой, пока оно не ответит."""
+        while self.state != CircuitStates.closed:
+            await asyncio.sleep(max(self.retry_at - time.monotonic(), 0))
+
+            self.state = CircuitStates.half_open
+            try:
+                await probe()
+
+            except Exception as e:
+                self.failures += 1
+                self.state = CircuitStates.open
+                self.retry_at = time.monotonic() + backoff_delay(self.failures)
+                logger.log(L.TCP, f'🔴 Проба {self.host}:{self.port} неудачна ({self.failures}): {str(e) or type(e).__name__}')
+                continue
+
+            self.record_success()
+
+    async def stop(self) -> None:
+        """Останавливаем фоновую пробу."""
+        if self._probe_task is None:
+            return
+
+        self._probe_task.cancel()
+        try:
+            await self._probe_task
+        except asyncio.CancelledError:
+            pass
+        self._probe_task = None
+
+
+class CircuitBreakerRegistry:
+    """Реестр предохранителей устройств по (host, port)."""
+    def __init__(self) -> None:
+        self._breakers: dict[tuple[str, int], CircuitBreaker] = {}
+
+    def get(self, host: str, port: int) -> CircuitBreaker:
+        """Возвращаем предохранитель устройства, создаем при первом обращении."""
+        device_socket = (host, port)
+
+        if device_socket not in self._breakers:
+            self._breakers[device_socket] = CircuitBreaker(host, port)
+
+        return self._breakers[device_socket]
+
+    async def stop_all(self) -> None:
+        """Останавливаем все фоновые пробы (например, при завершении сервера)."""
+        for breaker in self._breakers.values():
+            await breaker.stop()
+
+
+circuit_breakers = CircuitBreakerRegistry()
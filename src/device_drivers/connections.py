@@ -1,79 +1,417 @@
 import asyncio
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Callable
 
 from core.config import settings as s
 from core.log import L, logger
 
+from device_drivers.circuit_breaker import CircuitBreaker, circuit_breakers
+from device_drivers.deadline import is_exhausted, remaining
+from device_drivers.framers import Framer, buffered_size
+from device_drivers.profiles import DeviceProfile, device_profiles
+from device_drivers.transports import BufferedDeviceReader, BufferedDeviceWriter, open_buffered_connection
+from device_drivers.validators import DeviceTransports
+
+DeviceReader = asyncio.StreamReader | BufferedDeviceReader
+DeviceWriter = asyncio.StreamWriter | BufferedDeviceWriter
+
+
+@dataclass
+class PooledConnection:
+    """Открытое TCP соединение с устройством и его служебные данные.
+
+    framer - состояние разбора фреймов этого соединения (недописанный фрейм между чтениями).
+    """
+    reader: DeviceReader
+    writer: DeviceWriter
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    framer: Framer | None = None
+
+    def is_alive(self) -> bool:
+        """Проверяем, что соединение не закрыто ни нами, ни устройством."""
+        if self.writer.is_closing():
+            return False
+
+        # Устройство прислало FIN (полуоткрытое соединение) или сокет завершился с ошибкой
+        if self.reader.at_eof() or self.reader.exception() is not None:
+            return False
+
+        return True
+
+    async def discard_stale(self) -> int:
+        """Отбрасываем непрочитанные данные, оставшиеся от предыдущих обменов.
+
+        Иначе следующая команда получит в ответ чужой (устаревший) фрейм.
+        Недописанный фрейм в буфере фреймера тоже устарел.
+        Чтение непустого буфера не отдает управление циклу событий.
+        """
+        stale_bytes = self.framer.reset() if self.framer is not None else 0
+
+        if isinstance(self.reader, BufferedDeviceReader):
+            return stale_bytes + self.reader.discard()
+
+        buffered_bytes = buffered_size(self.reader)
+
+        if buffered_bytes:
+            await self.reader.read(buffered_bytes)
+
+        return stale_bytes + buffered_bytes
+
+    def idle_time(self) -> float:
+        """Время с момента последнего использования соединения, секунды."""
+        return time.monotonic() - self.last_used
+
+    def touch(self) -> None:
+        """Отмечаем момент последнего использования соединения."""
+        self.last_used = time.monotonic()
+
+
+def _configure_socket(writer: DeviceWriter, profile: DeviceProfile) -> None:
+    """Применяем к сокету параметры транспортного профиля устройства.
+
+    TCP keepalive нужен, чтобы ОС обнаруживала полуоткрытые соединения с выключенными устройствами.
+    """
+    sock: socket.socket | None = writer.get_extra_info('socket')
+
+    if sock is None:
+        return
+
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(profile.tcp_nodelay))
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    if profile.rcv_buffer_size:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, profile.rcv_buffer_size)
+    if profile.snd_buffer_size:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, profile.snd_buffer_size)
+
+    # Параметры keepalive доступны не на всех платформах
+    for option, value in (
+        ('TCP_KEEPIDLE', profile.keepalive_idle),
+        ('TCP_KEEPINTVL', profile.keepalive_interval),
+        ('TCP_KEEPCNT', profile.keepalive_count),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+class ConnectionPoolExhausted(Exception):
+    """Исключение - нет свободного места в пуле соединений за отведенное время."""
+    pass
+
+
+@dataclass
+class ConnectionPoolStats:
+    """Счетчики пула соединений с момента старта приложения."""
+    opens: int = 0
+    reuses: int = 0
+    evictions: int = 0
+    queued: int = 0
+
 
 class TcpConnection:
-    """Синглтон-класс для работы с TCP-подключениями к устройствам."""
-    _connections: dict[tuple[str, int], tuple[asyncio.StreamReader, asyncio.StreamWriter]] = {}
+    """Синглтон-класс пула TCP-подключений к устройствам.
+
+    Соединения не закрываются после каждой команды, а переиспользуются.
+    Перед выдачей соединение проверяется, при необходимости открывается новое.
+
+    Количество открытых сокетов ограничено на процесс (s.DEVICE_MAX_CONNECTIONS)
+    и на один IP (s.DEVICE_MAX_CONNECTIONS_PER_HOST). При достижении лимита закрывается
+    дольше всех не использовавшееся свободное соединение, а если свободных нет - открытие ждет в очереди.
+    Соединения, не использовавшиеся дольше idle_timeout профиля устройства, закрываются фоновой задачей.
+
+    Блокировки каналов обмена с устройствами хранятся здесь же: соединение, чья блокировка захвачена, занято.
+    """
+    _connections: dict[tuple[str, int], PooledConnection] = {}
+    _locks: dict[tuple[str, int], asyncio.Lock] = {}
+    _reserved: dict[str, int] = {}
+    # Условие освобождения места в пуле создается при первом ожидании в работающем цикле событий
+    _slot_released: tuple[asyncio.AbstractEventLoop, asyncio.Condition] | None = None
+    stats: ConnectionPoolStats = ConnectionPoolStats()
 
     @classmethod
-    def get(cls, host: str, port: int) -> tuple[asyncio.StreamReader | None, asyncio.StreamWriter | None]:
-        """Возвращает активное TCP соединение c устройством, если таковое есть."""
-        scales_socket = (host, port)
+    def lock(cls, host: str, port: int) -> asyncio.Lock:
+        """Возвращаем блокировку канала обмена с устройством."""
+        return cls._locks.setdefault((host, port), asyncio.Lock())
 
-        if scales_socket in cls._connections:
-            reader, writer = cls._connections[scales_socket]
+    @classmethod
+    def busy_locks(cls) -> list[asyncio.Lock]:
+        """Возвращаем захваченные блокировки - устройства, с которыми идет обмен."""
+        return [lock for lock in cls._locks.values() if lock.locked()]
 
-            if not writer.is_closing():
-                return reader, writer
+    @classmethod
+    def _is_busy(cls, device_socket: tuple[str, int]) -> bool:
+        """Проверяем, идет ли сейчас обмен с устройством."""
+        lock = cls._locks.get(device_socket)
+        return lock is not None and lock.locked()
+
+    @classmethod
+    async def get(cls, host: str, port: int, discard_stale: bool = True) -> tuple[DeviceReader | None, DeviceWriter | None]:
+        """Возвращает исправное TCP соединение c устройством, если таковое есть.
+
+        discard_stale=False - непрочитанные данные сохраняются: их разбирает сам драйвер
+        (например, шина Тензо-М раздает запоздавшие ответы по адресам весов).
+        """
+        device_socket = (host, port)
+        connection = cls._connections.get(device_socket)
+
+        if connection is None:
+            return None, None
+
+        stale_bytes = await connection.discard_stale() if discard_stale else 0
+        if stale_bytes:
+            logger.log(L.TCP, f'⚡ Отброшено {stale_bytes} байт устаревших данных от {host}:{port}')
 
-            del cls._connections[scales_socket]
+        if connection.idle_time() > device_profiles.get(host, port).idle_timeout:
+            logger.log(L.TCP, f'⚡ Соединение с {host}:{port} не использовалось слишком долго, будет открыто новое')
 
+        elif connection.is_alive():
+            connection.touch()
+            cls.stats.reuses += 1
+            return connection.reader, connection.writer
+
+        else:
+            logger.log(L.TCP, f'⚡ Соединение с {host}:{port} разорвано, будет открыто новое')
+
+        await cls.close(host, port)
         return None, None
 
     @classmethod
-    async def create(cls, host: str, port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
-        """Открываем новоем TCP соединение c устройством."""
-        scales_socket = (host, port)
+    def is_open(cls, host: str, port: int) -> bool:
+        """Проверяем, есть ли в пуле соединение с устройством."""
+        return (host, port) in cls._connections
 
-        for _ in range(s.CONNECT_TO_DEVICE_ATTEMPTS):
+    @classmethod
+    def touch(cls, host: str, port: int) -> None:
+        """Отмечаем использование соединения (например, прием очередного фрейма в потоке)."""
+        connection = cls._connections.get((host, port))
+        if connection is not None:
+            connection.touch()
+
+    @classmethod
+    def framer(cls, host: str, port: int, framer_factory: Callable[[], Framer]) -> Framer:
+        """Возвращаем фреймер соединения с устройством, при первом обращении создаем его.
+
+        Если соединения в пуле уже нет, отдаем новый фреймер без сохранения.
+        """
+        connection = cls._connections.get((host, port))
+
+        if connection is None:
+            return framer_factory()
+
+        if connection.framer is None:
+            connection.framer = framer_factory()
+
+        return connection.framer
+
+    @classmethod
+    def _host_count(cls, host: str) -> int:
+        """Количество открытых и открываемых соединений с одним IP."""
+        return sum(1 for device_host, _ in cls._connections if device_host == host) + cls._reserved.get(host, 0)
+
+    @classmethod
+    def _has_capacity(cls, host: str) -> bool:
+        """Проверяем, что открытие еще одного соединения не превысит лимиты пула."""
+        total = len(cls._connections) + sum(cls._reserved.values())
+        return total < s.DEVICE_MAX_CONNECTIONS and cls._host_count(host) < s.DEVICE_MAX_CONNECTIONS_PER_HOST
+
+    @classmethod
+    async def _evict_lru(cls, host: str) -> bool:
+        """Закрываем дольше всех не использовавшееся свободное соединение, чтобы освободить место в пуле.
+
+        Если исчерпан лимит на IP, выбираем только среди соединений с этим IP.
+        Возвращаем False, если все подходящие соединения заняты.
+        """
+        host_limited = cls._host_count(host) >= s.DEVICE_MAX_CONNECTIONS_PER_HOST
+        candidates = [
+            (connection.last_used, device_socket)
+            for device_socket, connection in cls._connections.items()
+            if not cls._is_busy(device_socket) and (not host_limited or device_socket[0] == host)
+        ]
+
+        if not candidates:
+            return False
+
+        _, (evicted_host, evicted_port) = min(candidates)
+        cls.stats.evictions += 1
+        logger.log(L.TCP, f'⚡ Лимит соединений, освобождаем место: {evicted_host}:{evicted_port}')
+        await cls.close(evicted_host, evicted_port)
+        return True
+
+    @classmethod
+    def _slot_condition(cls) -> asyncio.Condition:
+        """Возвращаем условие освобождения места в пуле для текущего цикла событий."""
+        loop = asyncio.get_running_loop()
+
+        if cls._slot_released is None or cls._slot_released[0] is not loop:
+            cls._slot_released = (loop, asyncio.Condition())
+
+        return cls._slot_released[1]
+
+    @classmethod
+    async def _reserve_slot(cls, host: str) -> None:
+        """Резервируем место в пуле под новое соединение, при необходимости ждем в очереди."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + remaining(s.DEVICE_CONNECTION_QUEUE_TIMEOUT)
+        queued = False
+
+        while not cls._has_capacity(host):
+            if await cls._evict_lru(host):
+                continue
+
+            if not queued:
+                queued = True
+                cls.stats.queued += 1
+                logger.log(L.TCP, f'⚡ Лимит соединений, открытие соединения с {host} ждет в очереди')
+
+            time_left = deadline - loop.time()
+            if time_left <= 0:
+                raise ConnectionPoolExhausted(s.MESSAGE_CONNECTION_POOL_EXHAUSTED)
+
+            # Место освобождается при закрытии соединения, а свободным соединение становится
+            # по окончании обмена, о котором пул не уведомляется - поэтому ждем с периодической перепроверкой
+            slot_released = cls._slot_condition()
             try:
-                reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(host, port), timeout=s.CONNECT_TO_DEVICE_TIMEOUT)
+                async with slot_released:
+                    await asyncio.wait_for(slot_released.wait(), timeout=min(time_left, 0.5))
+            except asyncio.TimeoutError:
+                pass
+
+        cls._reserved[host] = cls._reserved.get(host, 0) + 1
+
+    @classmethod
+    async def _release_slot(cls) -> None:
+        """Будим открытия, ожидающие места в пуле."""
+        slot_released = cls._slot_condition()
+        async with slot_released:
+            slot_released.notify_all()
+
+    @classmethod
+    async def _open(cls, host: str, port: int, transport: DeviceTransports) -> tuple[DeviceReader, DeviceWriter]:
+        """Однократная попытка открыть TCP соединение c устройством и поместить его в пул."""
+        open_func = open_buffered_connection if transport == DeviceTransports.buffered else asyncio.open_connection
+        profile: DeviceProfile = device_profiles.get(host, port)
+
+        await cls._reserve_slot(host)
+        try:
+            reader, writer = await asyncio.wait_for(
+                open_func(host, port), timeout=remaining(profile.connect_timeout))
+
+            _configure_socket(writer, profile)
+            cls._connections[(host, port)] = PooledConnection(reader, writer)
 
-                cls._connections[scales_socket] = (reader, writer)
-                logger.log(L.TCP, f'⚡ Открыто новое соединение с {host}:{port}')
+        except (Exception, asyncio.CancelledError):
+            cls._reserved[host] -= 1
+            await cls._release_slot()
+            raise
+
+        cls._reserved[host] -= 1
+        cls.stats.opens += 1
+        logger.log(L.TCP, f'⚡ Открыто новое соединение с {host}:{port}')
+        return reader, writer
+
+    @classmethod
+    async def create(
+        cls, host: str, port: int, transport: DeviceTransports = DeviceTransports.stream
+    ) -> tuple[DeviceReader, DeviceWriter]:
+        """Открываем новое TCP соединение c устройством.
+
+        Если устройство заведомо недоступно (предохранитель разомкнут), сразу выбрасываем DeviceUnavailable.
+        Если в пуле нет места дольше s.DEVICE_CONNECTION_QUEUE_TIMEOUT, выбрасываем ConnectionPoolExhausted.
+        """
+        breaker: CircuitBreaker = circuit_breakers.get(host, port)
+        breaker.check()
+
+        for _ in range(s.CONNECT_TO_DEVICE_ATTEMPTS):
+            try:
+                reader, writer = await cls._open(host, port, transport)
+                breaker.record_success()
                 return reader, writer
 
+            except ConnectionPoolExhausted:
+                # Устройство тут ни при чем, предохранитель не трогаем
+                raise
+
             except Exception as e:
+                if is_exhausted():
+                    # Вызывающая сторона больше не ждет, неудача не говорит о недоступности устройства
+                    raise asyncio.TimeoutError(s.MESSAGE_DEVICE_RESPONSE_TIMEOUT) from e
+
                 exception = e
                 continue
 
         logger.error(f'<❌ Не удалось установить соединение с {host}:{port}: {exception}')
+        breaker.record_failure(probe=lambda: cls._open(host, port, transport))
         raise exception
 
     @classmethod
-    async def get_or_create(cls, host: str, port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
-        """Возвращает активное TCP соединение c устройством или открывает новое."""
-        # Если соединение уже есть и не в состоянии закрытия, то его и возвращаем
-        reader, writer = cls.get(host, port)
+    async def get_or_create(
+        cls, host: str, port: int, transport: DeviceTransports = DeviceTransports.stream, discard_stale: bool = True,
+    ) -> tuple[DeviceReader, DeviceWriter]:
+        """Возвращает исправное TCP соединение c устройством или открывает новое."""
+        reader, writer = await cls.get(host, port, discard_stale)
 
         if reader is None or writer is None:
-            # Если соединения нет, то создаем новое
-            reader, writer = await cls.create(host, port)
+            reader, writer = await cls.create(host, port, transport)
 
         return reader, writer
 
     @classmethod
     async def close(cls, host: str, port: int) -> None:
         """Закрываем активное соединение."""
-        scales_socket = (host, port)
-        if scales_socket in cls._connections:
-            _, writer = cls._connections.pop(scales_socket)
-            writer.close()
-            await writer.wait_closed()
+        device_socket = (host, port)
+        if device_socket in cls._connections:
+            connection = cls._connections.pop(device_socket)
+            await cls._close_writer(connection.writer)
             logger.log(L.TCP, f'⚡ Закрыто соединение с устройством {host}:{port}')
+            await cls._release_slot()
 
     @classmethod
     async def close_all(cls) -> None:
         """Закрываем все активные соединения (например, при завершении сервера)."""
-        for (host, port), (_, writer) in cls._connections.items():
-            writer.close()
-            await writer.wait_closed()
-            logger.log(L.TCP, f'⚡ Закрыто соединение с устройством {host}:{port}')
+        connections = list(cls._connections.items())
         cls._connections.clear()
 
+        for (host, port), connection in connections:
+            await cls._close_writer(connection.writer)
+            logger.log(L.TCP, f'⚡ Закрыто соединение с устройством {host}:{port}')
+
+    @classmethod
+    async def reap_idle(cls) -> int:
+        """Закрываем свободные соединения, не использовавшиеся дольше idle_timeout профиля устройства."""
+        idle_sockets = [
+            device_socket
+            for device_socket, connection in cls._connections.items()
+            if not cls._is_busy(device_socket) and connection.idle_time() > device_profiles.get(*device_socket).idle_timeout
+        ]
+
+        for host, port in idle_sockets:
+            cls.stats.evictions += 1
+            logger.log(L.TCP, f'⚡ Соединение с {host}:{port} не используется, закрываем')
+            await cls.close(host, port)
+
+        return len(idle_sockets)
+
+    @classmethod
+    async def run_idle_reaper(cls, interval: float = s.DEVICE_IDLE_REAPER_INTERVAL) -> None:
+        """Фоновая задача: периодически закрываем неиспользуемые соединения."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await cls.reap_idle()
+            except Exception as e:
+                logger.error(f'❌  Ошибка при закрытии неиспользуемых соединений: {str(e)}')
+
+    @staticmethod
+    async def _close_writer(writer: DeviceWriter) -> None:
+        """Закрываем сокет, не обращая внимания на ошибки уже разорванного соединения."""
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
 
 tcp_connection = TcpConnection()
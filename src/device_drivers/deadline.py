@@ -0,0 +1,65 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable
+
+from core.config import settings as s
+
+from device_drivers.validators import DeviceResponse, ResponseTypes
+
+# Момент (по часам цикла событий), к которому вызывающая сторона ждет результат обмена с устройством
+_deadline: ContextVar[float | None] = ContextVar('device_deadline', default=None)
+
+
+@asynccontextmanager
+async def device_deadline(seconds: float) -> AsyncIterator[None]:
+    """Задаем общий бюджет времени на обмен с устройствами внутри блока.
+
+    Вложенный бюджет не может быть больше внешнего. По истечении бюджета работа внутри блока отменяется
+    и выбрасывается TimeoutError, а этапы обмена (подключение, отправка, ответ) заранее берут таймауты
+    не больше оставшегося времени (remaining).
+    """
+    deadline_at = asyncio.get_running_loop().time() + seconds
+
+    outer_deadline_at = _deadline.get()
+    if outer_deadline_at is not None:
+        deadline_at = min(deadline_at, outer_deadline_at)
+
+    token = _deadline.set(deadline_at)
+    try:
+        async with asyncio.timeout_at(deadline_at):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(timeout: float) -> float:
+    """Возвращаем таймаут этапа обмена с учетом оставшегося бюджета времени.
+
+    Если бюджет не задан, возвращаем timeout без изменений. Если бюджет исчерпан, выбрасываем TimeoutError.
+    """
+    deadline_at = _deadline.get()
+    if deadline_at is None:
+        return timeout
+
+    time_left = deadline_at - asyncio.get_running_loop().time()
+    if time_left <= 0:
+        raise asyncio.TimeoutError(s.MESSAGE_DEVICE_RESPONSE_TIMEOUT)
+
+    return min(timeout, time_left)
+
+
+def is_exhausted() -> bool:
+    """Проверяем, что бюджет времени задан и исчерпан."""
+    deadline_at = _deadline.get()
+    return deadline_at is not None and deadline_at <= asyncio.get_running_loop().time()
+
+
+async def with_deadline(device_call: Awaitable[DeviceResponse], seconds: float = s.DEVICE_REQUEST_DEADLINE) -> DeviceResponse:
+    """Выполняем вызов драйвера с общим бюджетом времени, по его истечении возвращаем ответ с ошибкой."""
+    try:
+        async with device_deadline(seconds):
+            return await device_call
+
+    except asyncio.TimeoutError:
+        return DeviceResponse(ok=False, type=ResponseTypes.error, message=s.MESSAGE_DEVICE_RESPONSE_TIMEOUT)
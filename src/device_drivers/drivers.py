@@ -1,7 +1,8 @@
 from device_drivers.scales.scales_base import BaseScalesDriver
 from device_drivers.scales.digi.di160 import weight_service_digi_di160
-from device_drivers.scales.mettler_toledo.mt_sics import weight_service_mt_sics
+from device_drivers.scales.mettler_toledo.mt_sics import weight_service_mt_sics, weight_service_mt_sics_sir
 from device_drivers.scales.tenzo_m.tenso_m import weight_service_tenso_m
+from device_drivers.scales.tenzo_m.bus import weight_service_tenso_m_bus
 
 from device_drivers.printers.printers_base import BasePrinterDriver
 from device_drivers.printers.dpl.dpl import printer_dpl_driver
@@ -10,7 +11,9 @@ from device_drivers.printers.ezpl.ezpl import printer_ezpl_driver
 
 scales_drivers = {
     'tenzo_m': weight_service_tenso_m,
+    'tenzo_m_bus': weight_service_tenso_m_bus,
     'mt_sics': weight_service_mt_sics,
+    'mt_sics_sir': weight_service_mt_sics_sir,
     'digi_di160': weight_service_digi_di160,
 }
 
@@ -0,0 +1,176 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from core.config import settings as s
+from core.log import L, logger
+
+from device_drivers.transports import BufferedDeviceReader
+
+
+def buffered_size(reader: asyncio.StreamReader | BufferedDeviceReader) -> int:
+    """Количество принятых читателем, но еще не прочитанных байт.
+
+    У StreamReader нет публичного способа узнать размер буфера, поэтому смотрим его напрямую.
+    """
+    if isinstance(reader, BufferedDeviceReader):
+        return reader.buffered()
+
+    return len(getattr(reader, '_buffer', b''))
+
+
+class Framer(ABC):
+    """Инкрементальный разбор потока байт устройства на фреймы.
+
+    Принятые байты накапливаются во внутреннем буфере между чтениями, поэтому фрейм, пришедший
+    несколькими пакетами, собирается целиком, а пакет с несколькими фреймами не теряет ни одного.
+    Наружу отдается самый свежий полный фрейм, более старые отбрасываются. Недописанный хвост
+    остается в буфере до следующего чтения. Мусор между фреймами пропускается (ресинхронизация).
+
+    Принятые байты копируются в буфер фреймера один раз (их нужно сохранить между чтениями), поиск и проверка
+    фреймов идут прямо в буфере через memoryview, каждый отдаваемый фрейм копируется в bytes еще один раз:
+    буфер фреймера меняется при следующем чтении, а фреймы живут дольше (очереди адресов шины, подписчики потока).
+
+    Фреймер хранит состояние конкретного соединения и живет вместе с ним в пуле (PooledConnection).
+    """
+    # Если в буфере столько байт и ни одного фрейма, начало буфера считаем мусором
+    max_buffer_size: int = s.DEVICE_RESPONSE_SIZE_BYTES
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self.garbage_bytes = 0
+
+    def reset(self) -> int:
+        """Отбрасываем накопленные данные, возвращаем их количество."""
+        size = len(self._buffer)
+        self._buffer.clear()
+        return size
+
+    def feed(self, data: bytes | memoryview) -> None:
+        """Добавляем принятые байты в буфер."""
+        self._buffer += data
+
+    @abstractmethod
+    def _next_frame(self, view: memoryview, position: int) -> tuple[int, int] | None:
+        """Ищем в буфере первый полный фрейм, начиная с позиции position, возвращаем его границы (start, end).
+
+        view - представление буфера без копирования, срезы для проверки фрейма берутся из него.
+        Все от position до start - мусор. Если полного фрейма нет, возвращаем None.
+        """
+
+    def complete_frames(self) -> list[bytes]:
+        """Извлекаем из буфера все полные фреймы по порядку поступления."""
+        frames = []
+        consumed = 0
+        garbage = 0
+
+        # Представление освобождается до удаления разобранных байт: bytearray с представлениями нельзя изменить
+        with memoryview(self._buffer) as view:
+            while (bounds := self._next_frame(view, consumed)) is not None:
+                start, end = bounds
+                garbage += start - consumed
+                frames.append(bytes(view[start:end]))
+                consumed = end
+
+        if len(self._buffer) - consumed > self.max_buffer_size:
+            # Фрейм так и не нашелся - оставляем только хвост, в котором может начинаться следующий
+            tail_start = len(self._buffer) - self.max_buffer_size
+            garbage += tail_start - consumed
+            consumed = tail_start
+
+        del self._buffer[:consumed]
+
+        if garbage:
+            self.garbage_bytes += garbage
+            logger.log(L.TCP, f'⚡ Пропущено {garbage} байт, не похожих на фрейм')
+
+        return frames
+
+    def newest(self) -> bytes | None:
+        """Извлекаем из буфера все полные фреймы, возвращаем последний из них (или None)."""
+        frames = self.complete_frames()
+        return frames[-1] if frames else None
+
+    async def read_frames(self, reader: asyncio.StreamReader | BufferedDeviceReader) -> list[bytes]:
+        """Читаем из соединения до получения хотя бы одного полного фрейма, возвращаем все полные фреймы.
+
+        Все, что к этому моменту уже пришло в сокет, забирается без ожидания.
+        Пустое чтение - устройство закрыло соединение.
+        """
+        while True:
+            data = await reader.read(s.DEVICE_RESPONSE_SIZE_BYTES)
+            if not data:
+                raise ConnectionResetError(s.MESSAGE_CONNECTION_CLOSED_BY_DEVICE)
+            self.feed(data)
+
+            frames = await self.read_buffered(reader)
+            if frames:
+                return frames
+
+    async def read_buffered(self, reader: asyncio.StreamReader | BufferedDeviceReader) -> list[bytes]:
+        """Забираем из соединения все, что уже пришло, без ожидания, возвращаем все полные фреймы."""
+        while buffered_size(reader):
+            self.feed(await reader.read(s.DEVICE_RESPONSE_SIZE_BYTES))
+
+        return self.complete_frames()
+
+    async def read_frame(self, reader: asyncio.StreamReader | BufferedDeviceReader) -> bytes:
+        """Читаем из соединения самый свежий полный фрейм (более старые, уже пришедшие фреймы отбрасываются)."""
+        frames = await self.read_frames(reader)
+        return frames[-1]
+
+
+class RawFramer(Framer):
+    """Фреймом считается все, что пришло за одно чтение (устройства без описанного формата ответа)."""
+    def _next_frame(self, view: memoryview, position: int) -> tuple[int, int] | None:
+        if position < len(self._buffer):
+            return position, len(self._buffer)
+        return None
+
+
+class FixedLengthFramer(Framer):
+    """Фреймы фиксированной длины, начинающиеся с байта синхронизации (например, Тензо-М: 10 байт, 0xFF).
+
+    Кандидат во фрейм проверяется функцией validate (например, по CRC). Если проверка не прошла,
+    ищем следующий байт синхронизации со сдвигом на один байт.
+    """
+    def __init__(self, size: int, sync: int, validate: Callable[[bytes | memoryview], bool] | None = None) -> None:
+        super().__init__()
+        self.size = size
+        self.sync = sync
+        self.validate = validate
+
+    def _next_frame(self, view: memoryview, position: int) -> tuple[int, int] | None:
+        buffer = self._buffer
+        start = position
+
+        while (start := buffer.find(self.sync, start)) >= 0 and start + self.size <= len(buffer):
+            end = start + self.size
+            if self.validate is None or self.validate(view[start:end]):
+                return start, end
+            start += 1
+
+        return None
+
+
+class DelimiterFramer(Framer):
+    r"""Фреймы, заканчивающиеся разделителем (например, '\r\n' у MT-SICS и DIGI).
+
+    Фрейм возвращается вместе с разделителем. Строки, не прошедшие проверку validate, считаются мусором.
+    """
+    def __init__(self, separator: bytes = b'\r\n', validate: Callable[[bytes | memoryview], bool] | None = None) -> None:
+        super().__init__()
+        self.separator = separator
+        self.validate = validate
+
+    def _next_frame(self, view: memoryview, position: int) -> tuple[int, int] | None:
+        buffer = self._buffer
+        start = position
+
+        while (separator_at := buffer.find(self.separator, start)) >= 0:
+            end = separator_at + len(self.separator)
+            if self.validate is None or self.validate(view[start:end]):
+                return start, end
+            start = end
+
+        return None
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from core.config import settings as s
+from core.log import logger
+
+from device_drivers.base import BaseDeviceDriver
+from device_drivers.circuit_breaker import circuit_breakers
+from device_drivers.connections import tcp_connection
+from device_drivers.validators import DeviceResponse, ScalesModes
+
+
+class DeviceManager:
+    """Управление жизненным циклом слоя устройств.
+
+    При старте приложения заранее открывает соединения со всеми устройствами
+    и запускает фоновое закрытие неиспользуемых соединений,
+    при остановке дожидается текущих обменов и закрывает все сокеты.
+    """
+    def __init__(self) -> None:
+        self._reaper_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запускаем фоновые задачи слоя устройств."""
+        if self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(tcp_connection.run_idle_reaper())
+
+    async def prewarm(self, devices: list[tuple[BaseDeviceDriver, str, int]]) -> None:
+        """Параллельно открываем и проверяем соединения с устройствами.
+
+        devices - список (драйвер, host, port).
+        Весы в режиме push пропускаем: из прогретого соединения никто не читает,
+        и непрерывно передаваемые фреймы копились бы в буфере сокета до отбраковки пулом.
+        """
+        devices = [
+            (driver, host, port) for driver, host, port in devices if getattr(driver, '_mode', None) != ScalesModes.push]
+        started_at = time.monotonic()
+
+        try:
+            responses: list[DeviceResponse] = await asyncio.wait_for(
+                asyncio.gather(*(driver.open_connection(host, port) for driver, host, port in devices)),
+                timeout=s.DEVICE_PREWARM_TIMEOUT)
+            reached = sum(response.ok for response in responses)
+
+        except asyncio.TimeoutError:
+            reached = sum(tcp_connection.is_open(host, port) for _, host, port in devices)
+            logger.warning(f'⚠️  Прогрев соединений прерван по таймауту {s.DEVICE_PREWARM_TIMEOUT} с')
+
+        elapsed = time.monotonic() - started_at
+        logger.info(f'🔥 Прогрев соединений с устройствами: доступно {reached} из {len(devices)}, {elapsed:.2f} с')
+
+    async def shutdown(self) -> None:
+        """Дожидаемся завершения текущих команд и закрываем все соединения с устройствами.
+
+        Соединения закрываются в любом случае, даже если предыдущие шаги остановки завершились ошибкой.
+        """
+        try:
+            if self._reaper_task is not None:
+                self._reaper_task.cancel()
+                try:
+                    await self._reaper_task
+                except asyncio.CancelledError:
+                    pass
+                self._reaper_task = None
+
+            try:
+                async with asyncio.timeout(s.DEVICE_SHUTDOWN_DRAIN_TIMEOUT):
+                    await BaseDeviceDriver.drain()
+            except TimeoutError:
+                logger.warning(f'⚠️  Не дождались завершения обмена с устройствами за {s.DEVICE_SHUTDOWN_DRAIN_TIMEOUT} с')
+
+            await circuit_breakers.stop_all()
+
+        finally:
+            await tcp_connection.close_all()
+
+        stats = tcp_connection.stats
+        logger.info(
+            f'🛑 Соединения с устройствами закрыты. Открыто: {stats.opens}, переиспользовано: {stats.reuses}, '
+            f'закрыто по простою/лимиту: {stats.evictions}, ожидало в очереди: {stats.queued}')
+
+
+device_manager = DeviceManager()
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, fields, replace
+
+from core.config import settings as s
+
+from device_drivers.validators import DeviceTransports
+
+
+@dataclass(frozen=True)
+class DeviceProfile:
+    """Транспортный профиль устройства: таймауты, период опроса и параметры сокета.
+
+    Значения по умолчанию берутся из настроек приложения.
+    Таймауты и интервалы - в секундах, размеры буферов - в байтах (None - значение ОС).
+    transport - низкоуровневый транспорт соединения, buffered включается для устройства явно.
+    """
+    connect_timeout: float = s.CONNECT_TO_DEVICE_TIMEOUT
+    write_timeout: float = s.CONNECT_TO_DEVICE_TIMEOUT
+    read_timeout: float = s.CONNECT_TO_DEVICE_TIMEOUT
+    idle_timeout: float = s.DEVICE_IDLE_TIMEOUT
+    poll_interval: float = s.DEVICE_POLL_INTERVAL
+
+    tcp_nodelay: bool = s.DEVICE_TCP_NODELAY
+    keepalive_idle: int = s.DEVICE_TCP_KEEPALIVE_IDLE
+    keepalive_interval: int = s.DEVICE_TCP_KEEPALIVE_INTERVAL
+    keepalive_count: int = s.DEVICE_TCP_KEEPALIVE_COUNT
+    rcv_buffer_size: int | None = None
+    snd_buffer_size: int | None = None
+    transport: DeviceTransports = DeviceTransports.stream
+
+    @classmethod
+    def from_orm(cls, device: object) -> 'DeviceProfile':
+        """Собираем профиль из записи устройства. Незаполненные в БД поля получают значения по умолчанию."""
+        overrides = {
+            f.name: getattr(device, f.name)
+            for f in fields(cls)
+            if getattr(device, f.name, None) is not None
+        }
+        return replace(cls(), **overrides)
+
+
+DEFAULT_DEVICE_PROFILE = DeviceProfile()
+
+
+class DeviceProfileRegistry:
+    """Реестр транспортных профилей устройств по (host, port).
+
+    Профили хранятся по справочникам-источникам (весы, принтеры), каждый справочник перезагружается целиком
+    при старте приложения и после изменения его записей. Для устройств без профиля действуют настройки по умолчанию.
+    """
+    def __init__(self) -> None:
+        self._profiles: dict[str, dict[tuple[str, int], DeviceProfile]] = {}
+
+    def get(self, host: str, port: int) -> DeviceProfile:
+        """Возвращаем профиль устройства."""
+        for profiles in self._profiles.values():
+            if (host, port) in profiles:
+                return profiles[(host, port)]
+
+        return DEFAULT_DEVICE_PROFILE
+
+    def load(self, source: str, devices: list[object]) -> None:
+        """Заполняем профили справочника source из записей устройств с полями ip, port и полями профиля."""
+        self._profiles[source] = {
+            (device.ip.compressed, device.port): DeviceProfile.from_orm(device)
+            for device in devices
+        }
+
+
+device_profiles = DeviceProfileRegistry()
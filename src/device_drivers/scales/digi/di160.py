@@ -1,7 +1,9 @@
+from functools import partial
+
+from device_drivers.framers import DelimiterFramer
 from device_drivers.scales.scales_base import BaseScalesDriver
-from device_drivers.scales.digi.utils import decode_response
+from device_drivers.scales.digi.utils import decode_response, is_valid_frame
 from device_drivers.validators import ScalesModes
-from device_drivers.utils import read_until_crlf
 
 
 class DigiDi160(BaseScalesDriver):
@@ -9,13 +11,14 @@ class DigiDi160(BaseScalesDriver):
 
     Дефолтные параметры: Частота = 9600, бит = 7, стоп бит = 1, четность = четные
     Возвращают вес в потоке, поэтому команды запроса веса нет
+    Из накопившихся кадров берется самый свежий, обрывки кадров отбрасываются
     """
     def __init__(self) -> None:
         super().__init__()
 
         self._mode = ScalesModes.push
         self._get_gross_weight_command = None
-        self._frame_reader_func = read_until_crlf
+        self._framer_factory = partial(DelimiterFramer, b'\r\n', is_valid_frame)
         self._decode_response_func = decode_response
 
 
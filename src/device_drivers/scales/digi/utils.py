@@ -1,7 +1,20 @@
+import re
+
 from device_drivers.validators import ScalesResponse
 
+# Complete streaming frame: two CR-separated numeric lines, terminated with CRLF
+_DI160_FRAME_PATTERN = re.compile(rb"^ *[+-]? *\d+\.\d+ *\r *[+-]? *\d+\.\d+ *\r\n$")
+
 
-def decode_response(data: bytes) -> ScalesResponse | None:
+def is_valid_frame(data: bytes | memoryview) -> bool:
+    r"""Check that a CRLF-terminated chunk has the full two-line shape, e.g. b'000.745\r000.000\r\n'.
+
+    A torn frame (e.g. only b'000.000\r\n' of the previous frame) must not be decoded as a weight.
+    """
+    return _DI160_FRAME_PATTERN.match(data) is not None
+
+
+def decode_response(data: bytes | memoryview) -> ScalesResponse | None:
     r"""Parse DIGI DI-160 ASCII streaming frame.
 
     Typical incoming payload:
@@ -16,6 +29,9 @@ def decode_response(data: bytes) -> ScalesResponse | None:
         or None if parsing fails.
     """
     try:
+        # Frame may come as a memoryview into the receive buffer; it is only a few bytes long
+        data = bytes(data)
+
         # Split into lines (keep only non-empty)
         lines = [ln for ln in data.split(b"\r") if ln.strip()]
         if not lines:
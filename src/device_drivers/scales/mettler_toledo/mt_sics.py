@@ -1,12 +1,16 @@
+from functools import partial
+
+from device_drivers.framers import DelimiterFramer
 from device_drivers.scales.scales_base import BaseScalesDriver
-from device_drivers.scales.mettler_toledo.utils import decode_response
-from device_drivers.utils import read_fixed_length
+from device_drivers.scales.mettler_toledo.utils import decode_response, is_valid_frame
 from device_drivers.validators import ScalesModes
 
 get_gross_weight_command = b'S\r\n'
 get_immediate_weight_command = b'SI\r\n'
 set_tare_command = b'T\r\n'
 clear_tare_command = b'TAC\r\n'
+# Непрерывная передача веса: каждое показание без ожидания успокоения; отменяется командами @, S, SI, SR
+start_immediate_stream_command = b'SIR\r\n'
 
 
 class MtSics(BaseScalesDriver):
@@ -20,8 +24,27 @@ class MtSics(BaseScalesDriver):
 
         self._mode = ScalesModes.pull
         self._get_gross_weight_command = get_gross_weight_command
-        self._frame_reader_func = read_fixed_length
+        self._framer_factory = partial(DelimiterFramer, b'\r\n', is_valid_frame)
         self._decode_response_func = decode_response
 
 
+class MtSicsSir(MtSics):
+    """Класс с реализацией протокола MTSics Level 1 в режиме непрерывной передачи веса (SIR).
+
+    Весы сами присылают каждое показание, без цикла "запрос - ответ" на каждое показание.
+    Передача включается командой SIR при подключении и останавливается командой SI перед закрытием соединения
+    (SI отменяет повтор и возвращает одно показание, не меняя состояния весов в отличие от сброса @).
+    Разовый запрос веса без потока - команда SI (текущий вес без ожидания успокоения).
+    Из накопившихся кадров потока берется самый свежий.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._mode = ScalesModes.push
+        self._get_gross_weight_command = get_immediate_weight_command
+        self._start_stream_command = start_immediate_stream_command
+        self._stop_stream_command = get_immediate_weight_command
+
+
 weight_service_mt_sics = MtSics()
+weight_service_mt_sics_sir = MtSicsSir()
@@ -10,6 +10,14 @@ _MT_SICS_PATTERN = re.compile(
 # b"SI D   -12.345 g"
 # b"T I      0.000 kg"
 
+# Any MT-SICS response line: command/error identifier, then optional space-separated fields
+_MT_SICS_FRAME_PATTERN = re.compile(rb"^[A-Z][A-Z0-9]{0,3}(?: [ -~]*)?\r\n$")
+
+
+def is_valid_frame(data: bytes | memoryview) -> bool:
+    """Check that a CRLF-terminated line looks like an MT-SICS response (not a torn line tail)."""
+    return _MT_SICS_FRAME_PATTERN.match(data) is not None
+
 
 def decode_response(data: bytes) -> ScalesResponse | None:
     """Parse MT-SICS (Mettler-Toledo IND226) weight response.
@@ -0,0 +1,63 @@
+from core.config import settings as s
+
+from device_drivers.validators import ScalesResponse
+
+
+class AdaptivePollScheduler:
+    """Адаптивный период опроса весов в режиме pull.
+
+    - на платформе груз, вес меняется или не успокоился - опрашиваем часто (fast_interval):
+      пока товар на весах, его взвешивание и снятие не должны ждать медленного опроса
+    - платформа пуста и вес стабилен - период плавно растет от базового периода профиля (base_interval) до idle_interval
+    - нет ответа или ответ не разобран - базовый период
+
+    Пауза между опросами не бывает меньше измеренного времени обмена с весами (сглаженного),
+    чтобы медленное устройство или шлюз не опрашивались непрерывно.
+    """
+    def __init__(
+        self,
+        base_interval: float,
+        fast_interval: float = s.SCALES_POLL_FAST_INTERVAL,
+        idle_interval: float = s.SCALES_POLL_IDLE_INTERVAL,
+        empty_threshold: float = s.SCALES_EMPTY_THRESHOLD,
+        change_threshold: float = s.SCALES_DIVISION,
+    ) -> None:
+        self.base_interval = base_interval
+        self.fast_interval = min(fast_interval, base_interval)
+        self.idle_interval = max(idle_interval, base_interval)
+        self.empty_threshold = empty_threshold
+        self.change_threshold = change_threshold
+
+        self.interval: float = base_interval
+        self.round_trip: float | None = None
+        self._last_weight: float | None = None
+
+    def _measure(self, round_trip: float) -> None:
+        """Сглаживаем время обмена (экспоненциальное скользящее среднее)."""
+        if self.round_trip is None:
+            self.round_trip = round_trip
+        else:
+            self.round_trip += (round_trip - self.round_trip) * 0.2
+
+    def next_delay(self, response: ScalesResponse | None, round_trip: float) -> float:
+        """Рассчитываем паузу до следующего опроса по последнему показанию и времени обмена."""
+        self._measure(round_trip)
+
+        if response is None:
+            self.interval = self.base_interval
+
+        else:
+            changing = (
+                self._last_weight is not None
+                and abs(response.weight - self._last_weight) >= self.change_threshold
+            )
+            self._last_weight = response.weight
+
+            if changing or not response.stable or abs(response.weight) > self.empty_threshold:
+                self.interval = self.fast_interval
+
+            else:
+                # Пустая платформа: замедляемся постепенно, чтобы не пропустить начало взвешивания
+                self.interval = min(max(self.interval, self.base_interval) * 1.5, self.idle_interval)
+
+        return max(self.interval, self.round_trip)
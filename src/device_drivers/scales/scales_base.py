@@ -1,12 +1,18 @@
 import asyncio
+import contextvars
+import time
 from typing import AsyncIterator
 
 from core.log import logger
 from core.config import settings as s
 
 from device_drivers.base import BaseDeviceDriver
-from device_drivers.utils import read_fixed_length
-from device_drivers.validators import DeviceResponse, ResponseTypes, ScalesModes, ScalesResponse
+from device_drivers.framers import RawFramer
+from device_drivers.circuit_breaker import backoff_delay
+from device_drivers.deadline import with_deadline
+from device_drivers.profiles import device_profiles
+from device_drivers.scales.polling import AdaptivePollScheduler
+from device_drivers.validators import DeviceResponse, ResponseTypes, ScalesModes, ScalesResponse, StreamEvents
 
 
 class BaseScalesDriver(BaseDeviceDriver):
@@ -15,15 +21,24 @@ class BaseScalesDriver(BaseDeviceDriver):
     Атрибуты:
         _mode - Режим работы весов pull/push (по умолчанию pull - по запросу).
         _get_gross_weight_command - Команда запроса веса
-        _frame_reader - Порядок разбора фрейма в ответе
+        _start_stream_command - Команда включения непрерывной передачи веса (режим push), None - весы передают сами
+        _stop_stream_command - Команда остановки непрерывной передачи, отправляется перед закрытием соединения
+        _framer_factory - Фабрика фреймера (выделение фреймов из потока байт)
         _decode_response - Функция декодирования ответа устройства
     """
+    _weight_reads: dict[tuple[str, int, int | None], asyncio.Task] = {}
+    _weight_waiters: dict[asyncio.Task, int] = {}
+    _last_weights: dict[tuple[str, int, int | None], tuple[float, DeviceResponse]] = {}
+    _push_streams: set[tuple[str, int]] = set()
+
     def __init__(self) -> None:
         super().__init__()
 
         self._mode = ScalesModes.pull
         self._get_gross_weight_command = None
-        self._frame_reader_func = read_fixed_length
+        self._start_stream_command = None
+        self._stop_stream_command = None
+        self._framer_factory = RawFramer
         self._decode_response_func = None
 
     def _decode_response(self, response_bytes: bytes) -> DeviceResponse:
@@ -38,52 +53,152 @@ class BaseScalesDriver(BaseDeviceDriver):
 
         return DeviceResponse(ok=True, type=ResponseTypes.data, data=response)
 
-    async def get_weight(self, host: str, port: int) -> DeviceResponse:
-        """Получаем вес с весов однократно."""
+    async def get_weight(self, host: str, port: int, address: int | None = None) -> DeviceResponse:
+        """Получаем вес с весов однократно.
+
+        address - адрес весов на линии (для драйверов, опрашивающих несколько весов через один шлюз).
+
+        Одновременные запросы веса с одних весов объединяются: к весам уходит один запрос,
+        все ожидающие получают один и тот же ответ. Успешное показание, полученное не раньше
+        s.SCALES_WEIGHT_FRESHNESS_WINDOW секунд назад, отдается без обращения к весам.
+
+        Общее чтение не зависит от бюджета времени первого из ожидающих: оно запускается с чистым контекстом
+        и ограничено собственным бюджетом s.DEVICE_REQUEST_DEADLINE, каждый ожидающий ждет в пределах своего.
+        Когда ожидающих не остается, чтение отменяется и освобождает устройство.
+        """
+        device_socket = (host, port, address)
+
+        last_weight = self._last_weights.get(device_socket)
+        if last_weight is not None and time.monotonic() - last_weight[0] <= s.SCALES_WEIGHT_FRESHNESS_WINDOW:
+            return last_weight[1]
+
+        weight_read = self._weight_reads.get(device_socket)
+        if weight_read is None:
+            # Чтение идет отдельной задачей: отмена одного из ожидающих не прерывает чтение для остальных
+            weight_read = asyncio.create_task(
+                with_deadline(self._read_weight(host, port, address)), context=contextvars.Context())
+            self._weight_reads[device_socket] = weight_read
+            weight_read.add_done_callback(lambda task: self._forget_weight_read(device_socket, task))
+
+        self._weight_waiters[weight_read] = self._weight_waiters.get(weight_read, 0) + 1
+        try:
+            return await asyncio.shield(weight_read)
+
+        finally:
+            waiters = self._weight_waiters.pop(weight_read) - 1
+            if waiters:
+                self._weight_waiters[weight_read] = waiters
+            elif not weight_read.done():
+                # Ожидающих не осталось: новые запросы начнут чтение заново, а не подхватят отменяемое
+                self._forget_weight_read(device_socket, weight_read)
+                weight_read.cancel()
+
+    def _forget_weight_read(self, device_socket: tuple[str, int, int | None], weight_read: asyncio.Task) -> None:
+        """Убираем чтение веса из объединяемых, если по весам еще не начато новое."""
+        if self._weight_reads.get(device_socket) is weight_read:
+            del self._weight_reads[device_socket]
+
+    async def _read_weight(self, host: str, port: int, address: int | None = None) -> DeviceResponse:
+        """Запрашиваем вес с весов, успешное показание запоминаем.
+
+        Если по весам идет поток в режиме push, отдаем последнее показание потока:
+        команда запроса веса прервала бы непрерывную передачу, а чтение из того же сокета отняло бы фрейм у потока.
+        """
+        last_weight = self._last_weights.get((host, port, address))
+        if (host, port) in self._push_streams and last_weight is not None:
+            return last_weight[1]
+
         command_bytes: bytes | None = getattr(self, '_get_gross_weight_command', None)
 
         try:
             response_bytes: bytes = await self._send_and_receive_workflow(host, port, command_bytes)
             response: DeviceResponse = self._decode_response(response_bytes)
-            return response
 
         except Exception as e:
             return DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e))
 
-    async def get_weight_stream(self, host: str, port: int) -> AsyncIterator[DeviceResponse]:
-        """Получаем вес с весов в цикле. Используем объект-генератор."""
-        command_bytes: bytes | None = getattr(self, '_get_gross_weight_command', None)
+        if response.ok:
+            self._last_weights[(host, port, address)] = (time.monotonic(), response)
 
-        try:
-            async for response_bytes in self._send_and_receive_stream(host, port, command_bytes):
-                response: DeviceResponse = self._decode_response(response_bytes)
-                yield response
+        return response
 
-        except Exception as e:
-            yield DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e))
-            return
+    async def get_weight_stream(self, host: str, port: int, address: int | None = None) -> AsyncIterator[DeviceResponse]:
+        """Получаем вес с весов в цикле. Используем объект-генератор.
 
-    async def _send_and_receive_stream(self, host: str, port: int, command_bytes: bytes) -> AsyncIterator[bytes]:
+        Поток не завершается при потере связи: вместо ошибки отдаем событие reconnecting,
+        переподключаемся с нарастающей задержкой (стартовая команда отправляется заново)
+        и после первого полученного фрейма отдаем событие resumed.
+        Успешные показания запоминаются для разовых запросов веса (get_weight).
+        """
+        if self._mode == ScalesModes.push:
+            command_bytes: bytes | None = self._start_stream_command
+        else:
+            command_bytes = self._get_gross_weight_command
+        attempt = 0
+
+        while True:
+            try:
+                async for response in self._send_and_receive_stream(host, port, command_bytes):
+                    if attempt:
+                        attempt = 0
+                        yield DeviceResponse(
+                            ok=True, type=ResponseTypes.info, event=StreamEvents.resumed, message=s.MESSAGE_STREAM_RESUMED)
+
+                    if response.ok:
+                        self._last_weights[(host, port, address)] = (time.monotonic(), response)
+                    yield response
+
+            except Exception as e:
+                attempt += 1
+                delay = backoff_delay(attempt, s.STREAM_RECONNECT_BACKOFF_BASE, s.STREAM_RECONNECT_BACKOFF_MAX)
+                reason = self._stream_error_reason(e)
+                yield DeviceResponse(
+                    ok=False, type=ResponseTypes.info, event=StreamEvents.reconnecting,
+                    message=f'{s.MESSAGE_STREAM_RECONNECTING} через {delay:.1f} с (попытка {attempt}): {reason}')
+
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _stream_error_reason(e: Exception) -> str:
+        """Формируем понятную пользователю причину обрыва потока."""
+        if isinstance(e, asyncio.TimeoutError):
+            return s.MESSAGE_DEVICE_RESPONSE_TIMEOUT
+
+        if isinstance(e, asyncio.IncompleteReadError):
+            return s.MESSAGE_CONNECTION_CLOSED_BY_DEVICE
+
+        return str(e) or type(e).__name__
+
+    async def _send_and_receive_stream(self, host: str, port: int, command_bytes: bytes) -> AsyncIterator[DeviceResponse]:
         """Реализуем цикл запросов/ответов устройства.
 
-        Функция представляет собой генератор.
+        Функция представляет собой генератор декодированных ответов: каждый фрейм декодируется один раз,
+        показание используется и для расчета паузы опроса, и для отдачи подписчикам.
         Реализуем разную последовательность действий для разных режимов работы весов.
 
+        В режиме pull каждый цикл "запрос - ответ" - отдельный обмен под блокировкой устройства,
+        между опросами к весам могут обращаться другие запросы. После остановки потока соединение остается в пуле.
+        Пауза между опросами подбирается AdaptivePollScheduler по последнему показанию и времени обмена.
+
         Если команда запроса веса не указана, пропускаем шаг отправки команды.
         """
         try:
-            reader, writer = await self._create_connection(host, port)
-
             if self._mode == ScalesModes.pull:
+                loop = asyncio.get_running_loop()
+                scheduler = AdaptivePollScheduler(device_profiles.get(host, port).poll_interval)
+
                 while True:
-                    await self._send(host, port, command_bytes, writer)
-                    yield await self._receive(host, port, reader)
-                    await asyncio.sleep(s.DEVICE_POLL_INTERVAL)
+                    started_at = loop.time()
+                    response_bytes = await self._exchange(host, port, command_bytes, wait_response=True)
+                    response = self._decode_response(response_bytes)
+                    delay = scheduler.next_delay(response.data if response.ok else None, loop.time() - started_at)
+
+                    yield response
+                    await asyncio.sleep(delay)
 
             else:
-                await self._send(host, port, command_bytes, writer)
-                while True:
-                    yield await self._receive(host, port, reader)
+                async for response_bytes in self._receive_push_stream(host, port, command_bytes):
+                    yield self._decode_response(response_bytes)
 
         except asyncio.TimeoutError as e:
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {s.MESSAGE_DEVICE_RESPONSE_TIMEOUT}')
@@ -93,5 +208,36 @@ class BaseScalesDriver(BaseDeviceDriver):
             logger.error(f'❌  Ошибка при обмене с {host}:{port}: {str(e)}')
             raise e
 
+    async def _receive_push_stream(self, host: str, port: int, command_bytes: bytes) -> AsyncIterator[bytes]:
+        """Читаем фреймы весов, работающих в режиме push.
+
+        Блокировка устройства берется на отправку стартовой команды и на чтение каждого фрейма,
+        поэтому разовые запросы веса к тем же весам не ждут окончания потока.
+        При остановке потока отправляем команду остановки передачи (если она задана) и закрываем соединение,
+        иначе весы продолжат слать данные в неиспользуемый сокет.
+        """
+        lock = self._device_lock(host, port)
+        writer = None
+        self._push_streams.add((host, port))
+
+        try:
+            async with lock:
+                reader, writer = await self._create_connection(host, port)
+                await self._send(host, port, command_bytes, writer)
+
+            while True:
+                async with lock:
+                    response_bytes: bytes = await self._receive(host, port, reader)
+                yield response_bytes
+
         finally:
-            await self._close_connection(host, port)
+            self._push_streams.discard((host, port))
+
+            async with lock:
+                if self._stop_stream_command and writer is not None:
+                    try:
+                        await self._send(host, port, self._stop_stream_command, writer)
+                    except Exception as e:
+                        logger.warning(f'⚠️  Не удалось остановить передачу веса {host}:{port}: {self._stream_error_reason(e)}')
+
+                await self._close_connection(host, port)
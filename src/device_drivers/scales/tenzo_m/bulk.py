@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from device_drivers.scales.tenzo_m.utils import BCD_TABLE, CRC_TABLE, FRAME_SIZE, FRAME_SYNC
+
+_CRC = np.array(CRC_TABLE, dtype=np.uint8)
+_BCD = np.array([-1 if digits is None else digits for digits in BCD_TABLE], dtype=np.int32)
+_POWERS_OF_TEN = 10.0 ** np.arange(8)
+
+
+@dataclass
+class DecodedFrames:
+    """Результат пакетного разбора фреймов Тензо-М: массивы по одному элементу на фрейм.
+
+    Для некорректных фреймов valid = False, weight = NaN, stable = False.
+    """
+    valid: np.ndarray
+    address: np.ndarray
+    weight: np.ndarray
+    stable: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def select(self, indices: np.ndarray) -> 'DecodedFrames':
+        """Выбираем часть фреймов по индексам или маске."""
+        return DecodedFrames(
+            valid=self.valid[indices], address=self.address[indices], weight=self.weight[indices], stable=self.stable[indices])
+
+
+def _decode(frames: np.ndarray) -> DecodedFrames:
+    """Проверяем и декодируем матрицу фреймов (count x FRAME_SIZE) целиком, без цикла по фреймам.
+
+    Те же таблицы CRC и BCD, что и в decode_response, но шаг таблицы применяется сразу ко всем фреймам.
+    """
+    crc = np.zeros(len(frames), dtype=np.uint8)
+    for column in range(1, 7):
+        crc = _CRC[crc] ^ frames[:, column]
+    crc = _CRC[crc]
+
+    digits_w0, digits_w1, digits_w2 = _BCD[frames[:, 3]], _BCD[frames[:, 4]], _BCD[frames[:, 5]]
+    con = frames[:, 6]
+
+    valid = (
+        (frames[:, 0] == FRAME_SYNC)
+        & (frames[:, 1] != FRAME_SYNC)
+        & (frames[:, 8] == 0xFF)
+        & (frames[:, 9] == 0xFF)
+        & (crc == frames[:, 7])
+        & (digits_w0 >= 0) & (digits_w1 >= 0) & (digits_w2 >= 0)
+    )
+
+    raw = digits_w2 * 10000 + digits_w1 * 100 + digits_w0
+    sign = np.where(con & 0b10000000, -1.0, 1.0)
+    weight = sign * raw / _POWERS_OF_TEN[con & 0b00000111]
+    weight[~valid] = np.nan
+
+    return DecodedFrames(
+        valid=valid,
+        address=frames[:, 1].copy(),
+        weight=weight,
+        stable=((con & 0b00010000) != 0) & valid,
+    )
+
+
+def decode_frames(data: bytes | bytearray | memoryview) -> DecodedFrames:
+    """Пакетно проверяем и декодируем подряд идущие фреймы (например, записанные ответы на опрос).
+
+    Длина данных должна быть кратна размеру фрейма, неполный хвост отбрасывается.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    count = len(buffer) // FRAME_SIZE
+    return _decode(buffer[:count * FRAME_SIZE].reshape(count, FRAME_SIZE))
+
+
+def find_frames(data: bytes | bytearray | memoryview) -> tuple[np.ndarray, DecodedFrames]:
+    """Находим и декодируем корректные фреймы в произвольном потоке байт (запись трафика с мусором и обрывками).
+
+    Кандидаты - все позиции байта синхронизации, проверяются пакетно. Возвращаем смещения найденных фреймов
+    и результат их разбора. Из перекрывающихся фреймов остается более ранний, поиск продолжается с конца
+    оставленного фрейма - как при поштучном разборе потока (FixedLengthFramer).
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if len(buffer) < FRAME_SIZE:
+        return np.empty(0, dtype=np.intp), _decode(np.empty((0, FRAME_SIZE), dtype=np.uint8))
+
+    offsets = np.flatnonzero(buffer[:len(buffer) - FRAME_SIZE + 1] == FRAME_SYNC)
+    candidates = _decode(buffer[offsets[:, np.newaxis] + np.arange(FRAME_SIZE)])
+
+    found = np.flatnonzero(candidates.valid)
+    found_offsets = offsets[found]
+
+    # Перекрытия редки (только в мусоре), обычно фильтр не нужен. Сравнивать с предыдущим кандидатом нельзя:
+    # кандидат, перекрывающий отброшенный, но не оставленный фрейм, должен остаться - проходим жадно по порядку
+    if np.any(np.diff(found_offsets) < FRAME_SIZE):
+        kept = []
+        free_from = 0
+        for index, offset in zip(found.tolist(), found_offsets.tolist()):
+            if offset >= free_from:
+                kept.append(index)
+                free_from = offset + FRAME_SIZE
+        found = np.array(kept, dtype=np.intp)
+
+    return offsets[found], candidates.select(found)
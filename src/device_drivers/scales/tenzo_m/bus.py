@@ -0,0 +1,265 @@
+import asyncio
+import time
+from collections import deque
+from functools import partial
+from typing import AsyncIterator
+
+from core.config import settings as s
+from core.log import logger
+
+from device_drivers.circuit_breaker import backoff_delay
+from device_drivers.connections import tcp_connection
+from device_drivers.deadline import remaining
+from device_drivers.framers import FixedLengthFramer
+from device_drivers.profiles import device_profiles
+from device_drivers.scales.scales_base import BaseScalesDriver
+from device_drivers.scales.tenzo_m.tenso_m import DEFAULT_ADDRESS
+from device_drivers.scales.tenzo_m.utils import (
+    COP_GROSS_WEIGHT, FRAME_SIZE, FRAME_SYNC, build_command, decode_response, is_valid_frame,
+)
+from device_drivers.validators import DeviceResponse, ResponseTypes, ScalesModes, StreamEvents
+
+
+class BusChannel:
+    """Канал показаний одних весов на линии для одного потребителя потока.
+
+    Хранит только последнее показание: потребитель, не успевший забрать ответ, получит более свежий.
+    Ошибки и события потока не замещаются показаниями: они копятся в очереди и отдаются раньше показания.
+    """
+    def __init__(self) -> None:
+        self._latest: DeviceResponse | None = None
+        self._events: deque[DeviceResponse] = deque(maxlen=s.SCALES_STREAM_EVENTS_QUEUE_SIZE)
+        self._updated = asyncio.Event()
+
+    def put(self, response: DeviceResponse) -> None:
+        """Запоминаем событие или ошибку в очереди, показание - вместо предыдущего."""
+        if response.is_stream_event:
+            self._events.append(response)
+        else:
+            self._latest = response
+        self._updated.set()
+
+    async def get(self) -> DeviceResponse:
+        """Ждем очередной ответ: сначала события по порядку, затем последнее показание."""
+        while True:
+            if self._events:
+                return self._events.popleft()
+
+            if self._latest is not None:
+                response, self._latest = self._latest, None
+                return response
+
+            self._updated.clear()
+            await self._updated.wait()
+
+
+class TensoMBusPoller:
+    """Циклический опрос нескольких весов Тензо-М на одной линии RS-485 через один шлюз (host, port).
+
+    Адреса, на которые есть подписчики, опрашиваются по очереди по одному соединению,
+    полный круг опроса занимает не меньше poll_interval профиля шлюза. Ответы раздаются подписчикам
+    по байту адреса во фрейме. Неответившие весы получают ошибку, опрос остальных продолжается.
+    При потере связи со шлюзом все подписчики получают событие reconnecting, после восстановления - resumed.
+    """
+    def __init__(self, driver: 'TensoMBus', host: str, port: int) -> None:
+        self.driver = driver
+        self.host = host
+        self.port = port
+        self.channels: dict[int, set[BusChannel]] = {}
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, address: int) -> BusChannel:
+        """Подписываемся на показания весов с адресом address, при необходимости запускаем опрос."""
+        channel = BusChannel()
+        self.channels.setdefault(address, set()).add(channel)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f'📡 Запущен опрос линии {self.host}:{self.port}')
+
+        return channel
+
+    def unsubscribe(self, address: int, channel: BusChannel) -> None:
+        """Отписываемся от показаний весов."""
+        channels = self.channels.get(address, set())
+        channels.discard(channel)
+
+        if not channels:
+            self.channels.pop(address, None)
+
+    async def stop(self) -> None:
+        """Останавливаем опрос линии."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+        logger.info(f'📡 Остановлен опрос линии {self.host}:{self.port}')
+
+    def publish(self, address: int, response: DeviceResponse) -> None:
+        """Отдаем ответ подписчикам весов с адресом address."""
+        for channel in self.channels.get(address, ()):
+            channel.put(response)
+
+    def _publish_all(self, response: DeviceResponse) -> None:
+        """Отдаем ответ подписчикам всех весов на линии."""
+        for address in self.channels:
+            self.publish(address, response)
+
+    async def _run(self) -> None:
+        """Опрашиваем адреса линии по кругу."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+
+        while True:
+            cycle_started_at = loop.time()
+
+            try:
+                for address in list(self.channels):
+                    response = await self.driver._request(self.host, self.port, address)
+
+                    # Связь восстановлена, только когда весы ответили: таймаут неответившего адреса - не восстановление
+                    if attempt and response.ok:
+                        attempt = 0
+                        self._publish_all(DeviceResponse(
+                            ok=True, type=ResponseTypes.info, event=StreamEvents.resumed, message=s.MESSAGE_STREAM_RESUMED))
+
+                    self.publish(address, response)
+
+            except Exception as e:
+                attempt += 1
+                delay = backoff_delay(attempt, s.STREAM_RECONNECT_BACKOFF_BASE, s.STREAM_RECONNECT_BACKOFF_MAX)
+                reason = self.driver._stream_error_reason(e)
+                self._publish_all(DeviceResponse(
+                    ok=False, type=ResponseTypes.info, event=StreamEvents.reconnecting,
+                    message=f'{s.MESSAGE_STREAM_RECONNECTING} через {delay:.1f} с (попытка {attempt}): {reason}'))
+
+                await asyncio.sleep(delay)
+                continue
+
+            poll_interval = device_profiles.get(self.host, self.port).poll_interval
+            await asyncio.sleep(max(poll_interval - (loop.time() - cycle_started_at), 0))
+
+
+class TensoMBus(BaseScalesDriver):
+    """Драйвер нескольких весов Тензо-М на одной линии RS-485 за одним преобразователем интерфейса.
+
+    Каждые весы - отдельное логическое устройство (host, port, address). Команды собираются для адреса весов
+    с расчетом CRC. Обмен со всеми весами линии идет по одному соединению под общей блокировкой шлюза,
+    ответы сопоставляются весам по байту адреса Adr, а не по порядку: запоздавший ответ одних весов
+    не будет принят за ответ других. Потоки веса всех весов линии обслуживает один TensoMBusPoller.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._mode = ScalesModes.pull
+        self._framer_factory = partial(FixedLengthFramer, FRAME_SIZE, FRAME_SYNC, is_valid_frame)
+        self._decode_response_func = decode_response
+        self._pollers: dict[tuple[str, int], TensoMBusPoller] = {}
+
+    async def get_weight(self, host: str, port: int, address: int | None = None) -> DeviceResponse:
+        """Получаем вес с весов с адресом address (по умолчанию 0x01) однократно."""
+        return await super().get_weight(host, port, address or DEFAULT_ADDRESS)
+
+    async def _read_weight(self, host: str, port: int, address: int | None = None) -> DeviceResponse:
+        """Запрашиваем вес с весов на линии."""
+        try:
+            return await self._request(host, port, address or DEFAULT_ADDRESS)
+
+        except Exception as e:
+            logger.error(f'❌  Ошибка при обмене с {host}:{port} (адрес {address}): {self._stream_error_reason(e)}')
+            return DeviceResponse(ok=False, type=ResponseTypes.error, message=self._stream_error_reason(e))
+
+    async def _request(self, host: str, port: int, address: int) -> DeviceResponse:
+        """Отправляем запрос веса весам с адресом address и ждем ответ с этим адресом.
+
+        Принятые за время ожидания фреймы других весов (например, запоздавшие ответы) раздаются по их адресам.
+        Непрочитанные данные соединения не отбрасываются: фреймы, пришедшие после предыдущего запроса,
+        раздаются по адресам до отправки команды, чтобы не принять запоздавший ответ за ответ на новый запрос.
+        Если весы не ответили за read_timeout, возвращаем ошибку, не закрывая соединение: остальные весы
+        на линии продолжают работать. При обрыве соединения оно закрывается и исключение пробрасывается.
+        """
+        async with self._device_lock(host, port):
+            reader, writer = await self._create_connection(host, port, discard_stale=False)
+            framer = tcp_connection.framer(host, port, self._framer_factory)
+
+            try:
+                for frame in await framer.read_buffered(reader):
+                    self._dispatch(host, port, frame)
+
+                await self._send(host, port, build_command(address, COP_GROSS_WEIGHT), writer)
+
+                async with asyncio.timeout(remaining(device_profiles.get(host, port).read_timeout)):
+                    while True:
+                        response = None
+
+                        for frame in await framer.read_frames(reader):
+                            frame_address, frame_response = self._dispatch(host, port, frame, address)
+                            if frame_address == address:
+                                response = frame_response
+
+                        if response is not None:
+                            tcp_connection.touch(host, port)
+                            return response
+
+            except TimeoutError:
+                return DeviceResponse(
+                    ok=False, type=ResponseTypes.error, message=f'{s.MESSAGE_DEVICE_RESPONSE_TIMEOUT} (адрес {address})')
+
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                await self._close_connection(host, port)
+                raise
+
+    def _dispatch(
+        self, host: str, port: int, frame: bytes, requested_address: int | None = None,
+    ) -> tuple[int, DeviceResponse]:
+        """Декодируем фрейм и запоминаем показание весов по адресу из фрейма.
+
+        Ответ запрошенных весов возвращается вызывающей стороне, ответы других весов сразу отдаются подписчикам.
+        Без requested_address (фреймы, пришедшие до отправки запроса) подписчикам отдаются все ответы.
+        """
+        address = frame[1]
+        response = self._decode_response(frame)
+
+        if response.ok:
+            self._last_weights[(host, port, address)] = (time.monotonic(), response)
+
+        poller = self._pollers.get((host, port))
+        if poller is not None and address != requested_address:
+            poller.publish(address, response)
+
+        return address, response
+
+    async def get_weight_stream(self, host: str, port: int, address: int | None = None) -> AsyncIterator[DeviceResponse]:
+        """Получаем вес с весов на линии в потоке.
+
+        Опрос линии общий для всех весов за шлюзом и останавливается, когда уходит последний подписчик.
+        """
+        address = address or DEFAULT_ADDRESS
+        device_socket = (host, port)
+
+        poller = self._pollers.get(device_socket)
+        if poller is None:
+            poller = self._pollers[device_socket] = TensoMBusPoller(self, host, port)
+
+        channel = poller.subscribe(address)
+
+        try:
+            while True:
+                yield await channel.get()
+
+        finally:
+            poller.unsubscribe(address, channel)
+
+            if not poller.channels:
+                if self._pollers.get(device_socket) is poller:
+                    del self._pollers[device_socket]
+                await poller.stop()
+
+
+weight_service_tenso_m_bus = TensoMBus()
@@ -1,25 +1,31 @@
+from functools import partial
+
+from device_drivers.framers import FixedLengthFramer
 from device_drivers.scales.scales_base import BaseScalesDriver
-from device_drivers.scales.tenzo_m.utils import decode_response
-from device_drivers.utils import read_fixed_length
+from device_drivers.scales.tenzo_m.utils import (
+    COP_GROSS_WEIGHT, COP_NET_WEIGHT, COP_SET_TARE, FRAME_SIZE, FRAME_SYNC, build_command, decode_response, is_valid_frame,
+)
 from device_drivers.validators import ScalesModes
 
+DEFAULT_ADDRESS = 0x01
 
-get_gross_weight_command = b'\xFF\x01\xC3\xE3\xFF\xFF'
-get_net_weight_command = b'\xFF\x01\xC2\x8A\xFF\xFF'
-set_tare_command = b'\xFF\x01\xC0\x58\xFF\xFF'
+get_gross_weight_command = build_command(DEFAULT_ADDRESS, COP_GROSS_WEIGHT)  # b'\xFF\x01\xC3\xE3\xFF\xFF'
+get_net_weight_command = build_command(DEFAULT_ADDRESS, COP_NET_WEIGHT)  # b'\xFF\x01\xC2\x8A\xFF\xFF'
+set_tare_command = build_command(DEFAULT_ADDRESS, COP_SET_TARE)  # b'\xFF\x01\xC0\x58\xFF\xFF'
 
 
 class TensoM(BaseScalesDriver):
     """Класс с реализацией протокола Тензо-М.
 
-    Для используемых команд значения CRC заранее рассчитаны.
+    Весы с адресом 0x01, по одному преобразователю интерфейса на весы (для нескольких весов на линии - TensoMBus).
+    Ответ - фрейм из 10 байт, начинающийся с 0xFF; фреймы выделяются по байту синхронизации и CRC.
     """
     def __init__(self) -> None:
         super().__init__()
 
         self._mode = ScalesModes.pull
         self._get_gross_weight_command = get_gross_weight_command
-        self._frame_reader_func = read_fixed_length
+        self._framer_factory = partial(FixedLengthFramer, FRAME_SIZE, FRAME_SYNC, is_valid_frame)
         self._decode_response_func = decode_response
 
 
@@ -2,6 +2,15 @@ import random
 
 from device_drivers.validators import ScalesResponse
 
+# Фрейм ответа: [FF][Adr][COP][W0][W1][W2][CON][CRC][FF][FF]
+FRAME_SIZE = 10
+FRAME_SYNC = 0xFF
+
+# Коды команд (COP)
+COP_SET_TARE = 0xC0
+COP_NET_WEIGHT = 0xC2
+COP_GROSS_WEIGHT = 0xC3
+
 
 def _crc_step(b_input: int, b_crc: int) -> int:
     """Perform one CRC step according to the protocol's assembler algorithm.
@@ -27,20 +36,51 @@ def _crc_step(b_input: int, b_crc: int) -> int:
     return ah & 0xFF
 
 
-def _compute_crc(data: bytes, as_hex: bool = False) -> str | int:
+# Шаг CRC линеен по входному байту: _crc_step(b, crc) == _crc_step(0, crc) ^ b.
+# Поэтому шаг сводится к одному обращению к таблице вместо 8 итераций цикла по битам
+CRC_TABLE: tuple[int, ...] = tuple(_crc_step(0x00, crc) for crc in range(256))
+
+# Упакованный BCD: байт -> число 0..99, для байтов с недесятичными тетрадами (A-F) - None
+BCD_TABLE: tuple[int | None, ...] = tuple(
+    (byte >> 4) * 10 + (byte & 0x0F) if (byte >> 4) < 10 and (byte & 0x0F) < 10 else None
+    for byte in range(256)
+)
+
+
+def _compute_crc(data: bytes | memoryview, as_hex: bool = False) -> str | int:
     """Compute CRC according to the scale's protocol.
 
     Processes all bytes + one trailing 0x00.
+    Works on memoryview slices of the receive buffer without copying.
     Returns int by default, or uppercase hex string if as_hex=True.
     """
+    table = CRC_TABLE
     crc = 0x00
-    for b in data + b'\x00':
-        crc = _crc_step(b, crc)
+    for b in data:
+        crc = table[crc] ^ b
+    crc = table[crc]
 
     return f'{crc:02X}' if as_hex else crc
 
 
-def decode_response(data: bytes) -> ScalesResponse | None:
+def build_command(address: int, command_code: int) -> bytes:
+    """Собираем команду для весов с адресом address на линии: [FF][Adr][COP][CRC][FF][FF]."""
+    core = bytes((address, command_code))
+    return bytes((FRAME_SYNC, *core, _compute_crc(core), 0xFF, 0xFF))
+
+
+def is_valid_frame(data: bytes | memoryview) -> bool:
+    """Проверяем, что байты - целый фрейм ответа: границы 0xFF, адрес (не 0xFF) и CRC."""
+    return (
+        len(data) == FRAME_SIZE
+        and data[0] == FRAME_SYNC
+        and data[1] != FRAME_SYNC
+        and data[-2:] == b'\xFF\xFF'
+        and _compute_crc(data[1:7]) == data[7]
+    )
+
+
+def decode_response(data: bytes | memoryview) -> ScalesResponse | None:
     """Разбираем полученный от весов поток.
 
     Возвращаем кортеж (вес_брутто, флаг стабильного веса, флаг перегруза),
@@ -73,13 +113,10 @@ def decode_response(data: bytes) -> ScalesResponse | None:
         W0, W1, W2, CON = core_without_crc[2], core_without_crc[3], core_without_crc[4], core_without_crc[5]  # noqa: N806
 
         # Packed BCD little-endian: W2 W1 W0 → 6 digits
-        bcd_value = (W2 << 16) | (W1 << 8) | W0
-        digits = (
-            f"{(bcd_value >> 16) & 0xFF:02X}"
-            f"{(bcd_value >> 8) & 0xFF:02X}"
-            f"{bcd_value & 0xFF:02X}"
-        )
-        raw = int(digits)
+        digits_w2, digits_w1, digits_w0 = BCD_TABLE[W2], BCD_TABLE[W1], BCD_TABLE[W0]
+        if digits_w2 is None or digits_w1 is None or digits_w0 is None:
+            return None
+        raw = digits_w2 * 10000 + digits_w1 * 100 + digits_w0
 
         # Decode CON byte
         sign = -1 if (CON & 0b10000000) else 1
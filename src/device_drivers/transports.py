@@ -0,0 +1,265 @@
+import asyncio
+
+from core.config import settings as s
+
+
+class DeviceBufferedProtocol(asyncio.BufferedProtocol):
+    """Протокол приема данных устройства в заранее выделенный буфер.
+
+    В отличие от StreamReader, данные из сокета пишутся напрямую в один переиспользуемый bytearray,
+    без создания нового объекта bytes на каждый пакет. Прочитанная часть буфера освобождается
+    сдвигом непрочитанного остатка в начало буфера (на месте, без перевыделения памяти).
+    При переполнении отбрасываются самые старые данные - для весов важны свежие показания.
+    """
+    def __init__(self, buffer_size: int = s.DEVICE_RECEIVE_BUFFER_SIZE_BYTES) -> None:
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+        self.transport: asyncio.Transport | None = None
+        self._data_waiter: asyncio.Future | None = None
+        self._drain_waiter: asyncio.Future | None = None
+        self._paused = False
+        self._eof = False
+        self._exception: Exception | None = None
+        self._closed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        self.overflows = 0
+
+    # Методы asyncio.BufferedProtocol, вызываются циклом событий
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        """Сохраняем транспорт."""
+        self.transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Отдаем циклу событий свободный хвост буфера для записи принятых данных."""
+        if self._end == len(self._buffer):
+            self.compact()
+
+        if self._end == len(self._buffer):
+            # Буфер целиком занят непрочитанными данными - отбрасываем старшую половину
+            self.overflows += 1
+            self._start += (self._end - self._start) // 2
+            self.compact()
+
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Фиксируем принятые данные и будим ожидающего читателя."""
+        self._end += nbytes
+        self._wakeup(self._data_waiter)
+
+    def eof_received(self) -> bool:
+        """Устройство закрыло соединение со своей стороны."""
+        self._eof = True
+        self._wakeup(self._data_waiter)
+        return False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Соединение закрыто - будим всех ожидающих."""
+        self._eof = True
+        self._exception = exc
+        self._wakeup(self._data_waiter, exc)
+        self._wakeup(self._drain_waiter, exc)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self) -> None:
+        """Буфер отправки транспорта переполнен."""
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """Буфер отправки транспорта освободился."""
+        self._paused = False
+        self._wakeup(self._drain_waiter)
+
+    # Служебные методы
+
+    @staticmethod
+    def _wakeup(waiter: asyncio.Future | None, exc: Exception | None = None) -> None:
+        """Завершаем future ожидающей корутины."""
+        if waiter is None or waiter.done():
+            return
+
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    def compact(self) -> None:
+        """Сдвигаем непрочитанные данные в начало буфера."""
+        if self._start == 0:
+            return
+
+        size = self._end - self._start
+        # Присваивание через memoryview копирует перекрывающиеся области корректно (memmove)
+        self._view[:size] = self._view[self._start:self._end]
+        self._start, self._end = 0, size
+
+    async def wait_for_data(self) -> None:
+        """Ждем поступления новых данных."""
+        if self._exception is not None:
+            raise self._exception
+
+        if self._eof:
+            return
+
+        self._data_waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._data_waiter
+        finally:
+            self._data_waiter = None
+
+    async def drain(self) -> None:
+        """Ждем освобождения буфера отправки."""
+        if self._exception is not None:
+            raise self._exception
+
+        if self.transport is not None and self.transport.is_closing():
+            # Даем циклу событий вызвать connection_lost
+            await asyncio.sleep(0)
+
+        if not self._paused:
+            return
+
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._drain_waiter
+        finally:
+            self._drain_waiter = None
+
+
+class BufferedDeviceReader:
+    """Читатель с интерфейсом StreamReader поверх DeviceBufferedProtocol.
+
+    Методы чтения возвращают memoryview на внутренний буфер без копирования.
+    Представление действительно до следующего чтения и до передачи управления циклу событий:
+    фрейм нужно декодировать (или скопировать) сразу после получения.
+    """
+    def __init__(self, protocol: DeviceBufferedProtocol) -> None:
+        self._protocol = protocol
+
+    def _take(self, size: int) -> memoryview:
+        """Отдаем size байт с начала непрочитанных данных."""
+        protocol = self._protocol
+        frame = protocol._view[protocol._start:protocol._start + size]
+        protocol._start += size
+        return frame
+
+    def _prepare(self) -> None:
+        """Освобождаем прочитанную часть буфера перед новым чтением."""
+        if self._protocol._start > len(self._protocol._buffer) // 2:
+            self._protocol.compact()
+
+    def buffered(self) -> int:
+        """Количество принятых, но еще не прочитанных байт."""
+        return self._protocol._end - self._protocol._start
+
+    def discard(self) -> int:
+        """Отбрасываем непрочитанные данные, возвращаем их количество."""
+        size = self.buffered()
+        self._protocol._start = self._protocol._end = 0
+        return size
+
+    def at_eof(self) -> bool:
+        """Устройство закрыло соединение и все данные прочитаны."""
+        return self._protocol._eof and not self.buffered()
+
+    def exception(self) -> Exception | None:
+        """Ошибка соединения, если была."""
+        return self._protocol._exception
+
+    async def read(self, n: int = -1) -> memoryview:
+        """Читаем до n байт из того, что уже пришло. Пустой результат - конец потока."""
+        self._prepare()
+
+        while not self.buffered() and not self._protocol._eof:
+            await self._protocol.wait_for_data()
+
+        size = self.buffered() if n < 0 else min(n, self.buffered())
+        return self._take(size)
+
+    async def readexactly(self, n: int) -> memoryview:
+        """Читаем ровно n байт."""
+        self._prepare()
+
+        while self.buffered() < n:
+            if self._protocol._eof:
+                raise asyncio.IncompleteReadError(bytes(self._take(self.buffered())), n)
+            await self._protocol.wait_for_data()
+
+        return self._take(n)
+
+    async def readuntil(self, separator: bytes = b'\n') -> memoryview:
+        """Читаем данные до разделителя включительно. Поиск идет прямо в буфере, без копирования."""
+        protocol = self._protocol
+
+        # Быстрый путь: кадр уже целиком в буфере
+        position = protocol._buffer.find(separator, protocol._start, protocol._end)
+        if position >= 0:
+            start = protocol._start
+            protocol._start = position + len(separator)
+            return protocol._view[start:protocol._start]
+
+        self._prepare()
+        # Смещение от начала непрочитанных данных, до которого разделитель уже искали.
+        # Храним относительно начала, так как при приеме данных буфер может уплотниться
+        searched = max(self.buffered() - len(separator) + 1, 0)
+
+        while True:
+            if protocol._eof:
+                raise asyncio.IncompleteReadError(bytes(self._take(self.buffered())), None)
+
+            overflows = protocol.overflows
+            await protocol.wait_for_data()
+
+            if protocol.overflows != overflows:
+                searched = 0
+
+            position = protocol._buffer.find(separator, protocol._start + searched, protocol._end)
+
+            if position >= 0:
+                return self._take(position + len(separator) - protocol._start)
+
+            # Разделитель может начаться в конце уже просмотренных данных
+            searched = max(self.buffered() - len(separator) + 1, 0)
+
+
+class BufferedDeviceWriter:
+    """Писатель с интерфейсом StreamWriter поверх DeviceBufferedProtocol."""
+    def __init__(self, transport: asyncio.Transport, protocol: DeviceBufferedProtocol) -> None:
+        self.transport = transport
+        self._protocol = protocol
+
+    def write(self, data: bytes) -> None:
+        """Отправляем данные."""
+        self.transport.write(data)
+
+    async def drain(self) -> None:
+        """Ждем, пока данные уйдут в сокет."""
+        await self._protocol.drain()
+
+    def is_closing(self) -> bool:
+        """Соединение закрыто или закрывается."""
+        return self.transport.is_closing()
+
+    def close(self) -> None:
+        """Закрываем соединение."""
+        self.transport.close()
+
+    async def wait_closed(self) -> None:
+        """Ждем закрытия соединения."""
+        await self._protocol._closed
+
+    def get_extra_info(self, name: str, default: object = None) -> object:
+        """Информация о транспорте (сокет, адрес и т.д.)."""
+        return self.transport.get_extra_info(name, default)
+
+
+async def open_buffered_connection(host: str, port: int) -> tuple[BufferedDeviceReader, BufferedDeviceWriter]:
+    """Открываем TCP соединение с приемом данных в заранее выделенный буфер."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_connection(DeviceBufferedProtocol, host, port)
+    return BufferedDeviceReader(protocol), BufferedDeviceWriter(transport, protocol)
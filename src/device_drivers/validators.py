@@ -1,6 +1,6 @@
 from enum import Enum, StrEnum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from core.config import settings as s
 
@@ -22,6 +22,43 @@ class ScalesModes(StrEnum):
     push = 'push'
 
 
+class StreamEvents(StrEnum):
+    """События потока данных устройства.
+
+    reconnecting - связь с устройством потеряна, поток переподключается
+    resumed - связь восстановлена, данные снова поступают
+    """
+    reconnecting = 'reconnecting'
+    resumed = 'resumed'
+
+
+class DeviceTransports(StrEnum):
+    """Варианты низкоуровневого транспорта обмена с устройством.
+
+    stream - asyncio.StreamReader/StreamWriter (по умолчанию)
+    buffered - asyncio.BufferedProtocol с приемом в заранее выделенный буфер (без выделения памяти на каждое чтение)
+    """
+    stream = 'stream'
+    buffered = 'buffered'
+
+
+class DeviceProfileSchema(BaseModel):
+    """Класс для валидации транспортного профиля устройства. Пустое поле - значение по умолчанию."""
+    connect_timeout: float | None = Field(default=None, gt=0)
+    write_timeout: float | None = Field(default=None, gt=0)
+    read_timeout: float | None = Field(default=None, gt=0)
+    idle_timeout: float | None = Field(default=None, gt=0)
+    poll_interval: float | None = Field(default=None, gt=0)
+
+    tcp_nodelay: bool | None = None
+    keepalive_idle: int | None = Field(default=None, ge=1)
+    keepalive_interval: int | None = Field(default=None, ge=1)
+    keepalive_count: int | None = Field(default=None, ge=1)
+    rcv_buffer_size: int | None = Field(default=None, ge=1024)
+    snd_buffer_size: int | None = Field(default=None, ge=1024)
+    transport: DeviceTransports | None = None
+
+
 class ScalesResponse(BaseModel):
     """Класс для валидации и сериализации блока данных в ответе весов серверу."""
     weight: float
@@ -40,6 +77,14 @@ class DeviceResponse(BaseModel):
     type: ResponseTypes
     data: str | ScalesResponse | None = None
     message: str | None = None
+    event: StreamEvents | None = None
+    # Порядковый номер показания в истории весов (scales_history), проставляется хабом потоков; не сериализуется
+    seq: int | None = Field(default=None, exclude=True)
+
+    @property
+    def is_stream_event(self) -> bool:
+        """Событие потока или ошибка: в потоке такие ответы не замещаются следующими показаниями."""
+        return self.event is not None or not self.ok
 
 
 class NotImplementedClass():
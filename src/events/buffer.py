@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+from core.config import settings as s
+from core.database import engine
+from core.log import logger
+
+from events.models import DeviceEventOrm
+from events.schemas import COLUMNS, DeviceEventSchema
+
+
+class EventWriteBuffer:
+    """Буфер отложенной записи журнала событий устройств.
+
+    События копятся в памяти и записываются в БД пачками через COPY (asyncpg copy_records_to_table):
+    пачка уходит, когда в буфере набралось s.EVENTS_BATCH_SIZE событий или самое старое событие ждет
+    дольше s.EVENTS_FLUSH_INTERVAL секунд. Одна операция COPY вместо INSERT и commit на каждое событие.
+
+    Размер буфера ограничен s.EVENTS_BUFFER_MAX_SIZE. Асинхронные источники (put) при заполненном буфере
+    ждут освобождения места. Источники, которые не могут ждать (put_nowait из потока веса),
+    при заполненном буфере пишут событие сразу в резервный файл (в отдельном потоке, не задерживая цикл событий).
+    Если запись пачки в БД не удалась, пачка дописывается в резервный файл (JSON Lines) и повторно
+    записывается в БД при запуске, после следующей успешной записи или при простое - раз в
+    s.EVENTS_SPOOL_RETRY_INTERVAL секунд. При остановке все накопленные события записываются в БД
+    или в резервный файл. Доставка - не менее одного раза: если перенос
+    резервного файла в БД прервется (сбой БД, аварийная остановка), уже перенесенные события запишутся повторно.
+    """
+    def __init__(self, spool_path: str = s.EVENTS_SPOOL_FILE_PATH) -> None:
+        self.spool_path = Path(spool_path)
+        self._events: list[DeviceEventSchema] = []
+        self._oldest_at: float | None = None
+        self._not_empty = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        # Дозапись и переименование резервного файла идут в отдельных потоках и не должны пересекаться
+        self._spool_lock = threading.Lock()
+        self._spool_tasks: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        """Запись журнала запущена."""
+        return self._task is not None
+
+    async def put(self, event: DeviceEventSchema) -> None:
+        """Добавляем событие в буфер, при заполненном буфере ждем освобождения места."""
+        if self._task is None:
+            return
+
+        while len(self._events) >= s.EVENTS_BUFFER_MAX_SIZE:
+            self._space_available.clear()
+            await self._space_available.wait()
+
+        self._append(event)
+
+    def put_nowait(self, event: DeviceEventSchema) -> None:
+        """Добавляем событие в буфер без ожидания, при заполненном буфере пишем его в резервный файл."""
+        if self._task is None:
+            return
+
+        if len(self._events) >= s.EVENTS_BUFFER_MAX_SIZE:
+            logger.warning('⚠️  Буфер журнала событий заполнен, событие записано в резервный файл')
+            task = asyncio.create_task(asyncio.to_thread(self._spool, [event]))
+            self._spool_tasks.add(task)
+            task.add_done_callback(self._spool_tasks.discard)
+            return
+
+        self._append(event)
+
+    def _append(self, event: DeviceEventSchema) -> None:
+        """Добавляем событие, при наборе пачки будим запись."""
+        if not self._events:
+            self._oldest_at = time.monotonic()
+            self._not_empty.set()
+
+        self._events.append(event)
+        if len(self._events) >= s.EVENTS_BATCH_SIZE:
+            self._batch_ready.set()
+
+    def start(self) -> None:
+        """Запускаем фоновую запись журнала."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info('🧾 Запущена запись журнала событий устройств')
+
+    async def stop(self) -> None:
+        """Останавливаем фоновую запись: задача записи дописывает все накопленные события и завершается.
+
+        Задача не отменяется: отмена посреди COPY оставила бы пачку ни в БД, ни в резервном файле.
+        """
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._not_empty.set()
+        self._batch_ready.set()
+
+        await self._task
+        self._task = None
+
+        if self._spool_tasks:
+            await asyncio.gather(*self._spool_tasks)
+
+    async def _run(self) -> None:
+        """Записываем пачки по заполнению или по возрасту самого старого события."""
+        await self._replay_spool()
+
+        while not self._stopping:
+            try:
+                async with asyncio.timeout(s.EVENTS_SPOOL_RETRY_INTERVAL):
+                    await self._not_empty.wait()
+            except TimeoutError:
+                # Простой: повторяем перенос резервного файла, если БД была недоступна
+                await self._replay_spool()
+                continue
+
+            if self._oldest_at is not None:
+                try:
+                    async with asyncio.timeout(max(self._oldest_at + s.EVENTS_FLUSH_INTERVAL - time.monotonic(), 0)):
+                        await self._batch_ready.wait()
+                except TimeoutError:
+                    pass
+
+            if self._events:
+                await self._flush()
+
+        while self._events:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Записываем в БД одну пачку событий, при ошибке - в резервный файл."""
+        batch = self._events[:s.EVENTS_BATCH_SIZE]
+        self._events = self._events[s.EVENTS_BATCH_SIZE:]
+        self._oldest_at = time.monotonic() if self._events else None
+        if not self._events:
+            self._not_empty.clear()
+        if len(self._events) < s.EVENTS_BATCH_SIZE:
+            self._batch_ready.clear()
+        self._space_available.set()
+
+        try:
+            await self._copy(batch)
+
+        except asyncio.CancelledError:
+            # Пачка возвращается в буфер: ее запишет следующая запись или остановка
+            self._events[:0] = batch
+            self._oldest_at = time.monotonic()
+            self._not_empty.set()
+            raise
+
+        except Exception as e:
+            logger.error(f'❌  Не удалось записать в БД {len(batch)} событий, записываем в резервный файл: {str(e)}')
+            await asyncio.to_thread(self._spool, batch)
+            return
+
+        await self._replay_spool()
+
+    async def _copy(self, batch: list[DeviceEventSchema]) -> None:
+        """Записываем пачку событий одной операцией COPY."""
+        async with engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                DeviceEventOrm.__tablename__,
+                records=[event.to_record() for event in batch],
+                columns=COLUMNS,
+                timeout=s.EVENTS_COPY_TIMEOUT,
+            )
+
+    def _spool(self, batch: list[DeviceEventSchema]) -> None:
+        """Дописываем события в резервный файл. Выполняется в отдельном потоке."""
+        with self._spool_lock:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(self.spool_path, 'a', encoding='utf-8') as file:
+                file.writelines(f'{event.model_dump_json()}\n' for event in batch)
+
+    def _take_spool(self, replaying_path: Path) -> None:
+        """Переименовываем резервный файл для переноса в БД. Выполняется в отдельном потоке."""
+        with self._spool_lock:
+            if not replaying_path.exists() and self.spool_path.exists():
+                self.spool_path.rename(replaying_path)
+
+    async def _replay_spool(self) -> None:
+        """Записываем в БД события из резервного файла и удаляем его.
+
+        Файл на время переноса переименовывается: новые отказы пишутся в новый резервный файл.
+        Файл, перенос которого прервался, переносится заново при следующей успешной записи.
+        """
+        replaying_path = self.spool_path.with_suffix('.replaying')
+
+        try:
+            while replaying_path.exists() or self.spool_path.exists():
+                await asyncio.to_thread(self._take_spool, replaying_path)
+
+                lines = (await asyncio.to_thread(replaying_path.read_text, encoding='utf-8')).splitlines()
+                events = [DeviceEventSchema.model_validate_json(line) for line in lines if line.strip()]
+
+                for first in range(0, len(events), s.EVENTS_BATCH_SIZE):
+                    await self._copy(events[first:first + s.EVENTS_BATCH_SIZE])
+
+                replaying_path.unlink()
+                logger.info(f'🧾 Из резервного файла в БД записано {len(events)} событий')
+
+        except Exception as e:
+            logger.error(f'❌  Не удалось записать в БД события из резервного файла {replaying_path}: {str(e)}')
+
+
+events_buffer = EventWriteBuffer()
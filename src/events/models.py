@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.config import settings as s
+from core.database import AppBaseClass
+
+
+class DeviceEventOrm(AppBaseClass):
+    """Модель журнала событий устройств: циклы взвешивания и печать этикеток.
+
+    Записи добавляются пачками через COPY (events.buffer), без ORM, поэтому внешних ключей нет:
+    удаление весов или принтера не должно приводить к отказу записи пачки.
+    """
+    __tablename__ = 'device_events'
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    event: Mapped[str] = mapped_column(String(s.DEVICE_EVENT_NAME_MAX_LENGTH), nullable=False)
+
+    ip: Mapped[str] = mapped_column(INET, nullable=False)  # работает только с postgres
+    port: Mapped[int] = mapped_column(Integer, nullable=False)
+    address: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    weight: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    __order_by__ = (id, )
@@ -0,0 +1,31 @@
+from datetime import datetime
+from enum import StrEnum
+from ipaddress import IPv4Address
+
+from pydantic import BaseModel, Field
+
+
+class DeviceEventTypes(StrEnum):
+    """Типы событий журнала устройств: события цикла взвешивания (WeighingEvents) и печать этикетки."""
+    loaded = 'loaded'
+    weighed = 'weighed'
+    unloaded = 'unloaded'
+    label_printed = 'label_printed'
+
+
+class DeviceEventSchema(BaseModel):
+    """Модель события устройства для записи в журнал."""
+    created_at: datetime = Field(default_factory=datetime.now)
+    event: DeviceEventTypes
+    ip: IPv4Address
+    port: int
+    address: int | None = None
+    weight: float | None = None
+
+    def to_record(self) -> tuple:
+        """Запись для COPY в порядке столбцов COLUMNS."""
+        return self.created_at, self.event.value, self.ip, self.port, self.address, self.weight
+
+
+# Столбцы таблицы device_events, заполняемые при записи пачки
+COLUMNS = ('created_at', 'event', 'ip', 'port', 'address', 'weight')
@@ -1,6 +1,10 @@
+from contextlib import AbstractAsyncContextManager, aclosing
+from typing import AsyncIterator
+
 from fastapi import Request, status
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.types import Send
 
 from core.config import templates
 
@@ -21,3 +25,34 @@ class WebJsonResponse(BaseModel):
     ok: bool
     message: str | None = None
     data: str | ScalesResponse | None = None
+
+
+class EventStreamResponse(StreamingResponse):
+    """Ответ Server-Sent Events.
+
+    source - асинхронный контекстный менеджер, отдающий асинхронный генератор сообщений.
+    Контекст (например, подписка на поток весов) открывается на время отправки ответа и закрывается
+    сразу по ее завершении, в том числе при отключении клиента, а генератор сообщений явно закрывается:
+    подписка не доживает до сборщика мусора. Отключение клиента проверяется перед каждым сообщением.
+    Кэширование и буферизация ответа прокси (nginx) запрещены, иначе сообщения приходят пачками.
+    """
+    def __init__(self, source: AbstractAsyncContextManager[AsyncIterator[str]], request: Request) -> None:
+        super().__init__(
+            content=iter(()),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+        self.source = source
+        self.request = request
+
+    async def stream_response(self, send: Send) -> None:
+        """Отправляем сообщения, пока клиент подключен."""
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+
+        async with self.source as messages, aclosing(messages):
+            async for message in messages:
+                if await self.request.is_disconnected():
+                    return
+                await send({'type': 'http.response.body', 'body': message.encode(self.charset), 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
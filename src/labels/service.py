@@ -7,9 +7,12 @@ from core.config import settings as s
 from core.exceptions import ObjectNotFound
 
 from device_drivers.drivers import get_printer_driver, printer_drivers
+from device_drivers.deadline import with_deadline
 from device_drivers.printers.printers_base import BasePrinterDriver
 from device_drivers.validators import DeviceResponse
 
+from events.buffer import events_buffer
+from events.schemas import DeviceEventSchema, DeviceEventTypes
 from items.service import web_items_service
 from items.schemas import ItemWebSchema
 from frontend.responses import WebJsonResponse
@@ -120,7 +123,12 @@ class LabelTemplatesService:
         if not driver:
             return WebJsonResponse(ok=False, message=s.MESSAGE_DRIVER_NOT_FOUND)
 
-        response: DeviceResponse = await driver.print_label(printer_dto.ip.compressed, printer_dto.port, command_to_print)
+        response: DeviceResponse = await with_deadline(
+            driver.print_label(printer_dto.ip.compressed, printer_dto.port, command_to_print))
+
+        if response.ok:
+            await events_buffer.put(DeviceEventSchema(
+                event=DeviceEventTypes.label_printed, ip=printer_dto.ip, port=printer_dto.port))
 
         return WebJsonResponse(ok=response.ok, message=response.message)
 
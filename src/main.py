@@ -3,6 +3,7 @@ from fastapi import FastAPI
 
 from core.config import settings as s
 from core.exceptions import register_exception_handlers
+from core.lifespan import lifespan
 from core.log import logger
 from core.routers import api_router, root_router, web_router
 
@@ -10,7 +11,8 @@ fastapi_app = FastAPI(
     title=s.APP_TITLE,
     openapi_url=s.OPENAPI_URL,
     docs_url=s.DOCS_URL,
-    redoc_url=s.REDOC_URL
+    redoc_url=s.REDOC_URL,
+    lifespan=lifespan,
 )
 
 fastapi_app.include_router(api_router)
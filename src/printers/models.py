@@ -3,14 +3,14 @@ from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.config import settings as s
-from core.database import AppBaseClass
+from core.database import AppBaseClass, DeviceProfileMixin
 
 from device_drivers.drivers import printer_drivers
 
 AVAILABLE_DRIVERS = printer_drivers.keys()
 
 
-class PrinterOrm(AppBaseClass):
+class PrinterOrm(DeviceProfileMixin, AppBaseClass):
     """Модель справочника принтеров этикеток."""
     __tablename__ = 'printers'
 
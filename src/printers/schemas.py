@@ -4,9 +4,10 @@ from pydantic import AfterValidator, BaseModel, ConfigDict, field_validator
 
 from core.config import settings as s
 from device_drivers.drivers import printer_drivers
+from device_drivers.validators import DeviceProfileSchema
 
 
-class PrinterReadWebSchema(BaseModel):
+class PrinterReadWebSchema(DeviceProfileSchema):
     """Модель представления записи принтеров для вывода в HTML."""
     id: int
     ip: IPv4Address
@@ -25,7 +26,7 @@ def driver_name_validator(value: str) -> str:
     return value
 
 
-class PrinterCreateUpdateWebSchema(BaseModel):
+class PrinterCreateUpdateWebSchema(DeviceProfileSchema):
     """Модель создания/изменения принтера для вывода в HTML."""
     ip: IPv4Address
     port: int
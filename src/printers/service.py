@@ -7,7 +7,9 @@ from core.config import settings as s
 from core.exceptions import ObjectNotFound
 
 from device_drivers.drivers import printer_drivers, get_printer_driver
+from device_drivers.deadline import with_deadline
 from device_drivers.printers.printers_base import BasePrinterDriver
+from device_drivers.profiles import device_profiles
 from device_drivers.validators import DeviceResponse
 
 from frontend.responses import WebJsonResponse
@@ -82,39 +84,54 @@ class PrintersService:
 
         return context
 
-    async def create(self, session: AsyncSession, ip: str, port: int, driver_name: str, description: str) -> int | None:
+    async def create(
+        self, session: AsyncSession, ip: str, port: int, driver_name: str, description: str, profile: dict | None = None
+    ) -> int | None:
         """Создаем принтер, возвращаем его id."""
         try:
             printer_dto = PrinterCreateUpdateWebSchema(
                 ip=ip,
                 port=port,
                 driver_name=driver_name,
-                description=description)
+                description=description,
+                **(profile or {}))
         except ValidationError:
             return None
 
         printer_id: int | None = await printers_repo.create(session, printer_dto)
+        await self.load_profiles(session)
 
         return printer_id
 
-    async def update(self, session: AsyncSession, printer_id: int, ip: str, port: int, driver_name: str, description: str) -> None:
+    async def update(
+        self, session: AsyncSession, printer_id: int, ip: str, port: int, driver_name: str, description: str,
+        profile: dict | None = None,
+    ) -> None:
         """Изменяем данные принтера, ничего не возвращаем."""
         try:
             printer_dto = PrinterCreateUpdateWebSchema(
                 ip=ip,
                 port=port,
                 driver_name=driver_name,
-                description=description)
+                description=description,
+                **(profile or {}))
         except ValidationError:
             return None
 
-        printer_id: int | None = await printers_repo.update(session, printer_id, printer_dto)
+        printer_id: int | None = await printers_repo.update(
+            session, printer_id, printer_dto, nullable_fields=set(profile) if profile is not None else None)
+        await self.load_profiles(session)
 
         return printer_id
 
     async def delete(self, session: AsyncSession, printer_id: int) -> None:
         """Удаляем принтер, ничего не возвращаем."""
         await printers_repo.delete(session, printer_id)
+        await self.load_profiles(session)
+
+    async def load_profiles(self, session: AsyncSession) -> None:
+        """Перезагружаем транспортные профили всех принтеров в реестр драйверов."""
+        device_profiles.load('printers', await self.get_all(session))
 
     async def test_connection(self, printer: PrinterShortSchema) -> WebJsonResponse:
         """Проверяем доступность принтера."""
@@ -123,7 +140,7 @@ class PrintersService:
         if driver is None:
             return WebJsonResponse(ok=False, message=s.MESSAGE_DRIVER_NOT_FOUND)
 
-        response: DeviceResponse = await driver.test_connection(printer.ip.compressed, printer.port)
+        response: DeviceResponse = await with_deadline(driver.test_connection(printer.ip.compressed, printer.port))
 
         return WebJsonResponse(ok=response.ok, message=response.message)
 
@@ -134,7 +151,9 @@ class PrintersService:
         if driver is None:
             return WebJsonResponse(ok=False, message=s.MESSAGE_DRIVER_NOT_FOUND)
 
-        response: DeviceResponse = await driver.load_font(printer.ip.compressed, printer.port, font.file_bytes, font.filename, font.font_id)
+        response: DeviceResponse = await with_deadline(
+            driver.load_font(printer.ip.compressed, printer.port, font.file_bytes, font.filename, font.font_id),
+            s.DEVICE_UPLOAD_DEADLINE)
 
         return WebJsonResponse(ok=response.ok, message=response.message)
 
@@ -145,7 +164,9 @@ class PrintersService:
         if driver is None:
             return WebJsonResponse(ok=False, message=s.MESSAGE_DRIVER_NOT_FOUND)
 
-        response: DeviceResponse = await driver.load_image(printer.ip.compressed, printer.port, image.file_bytes, image.filename)
+        response: DeviceResponse = await with_deadline(
+            driver.load_image(printer.ip.compressed, printer.port, image.file_bytes, image.filename),
+            s.DEVICE_UPLOAD_DEADLINE)
 
         return WebJsonResponse(ok=response.ok, message=response.message)
 
@@ -156,7 +177,7 @@ class PrintersService:
         if driver is None:
             return WebJsonResponse(ok=False, message=s.MESSAGE_DRIVER_NOT_FOUND)
 
-        response: DeviceResponse = await driver.send_arbitrary_command(printer.ip.compressed, printer.port, command)
+        response: DeviceResponse = await with_deadline(driver.send_arbitrary_command(printer.ip.compressed, printer.port, command))
 
         return WebJsonResponse(ok=response.ok, data=response.data, message=response.message)
 
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import templates, settings as s
 from core.database import get_async_session
-from core.dependencies import logging_dependency
+from core.dependencies import device_profile_form, logging_dependency
 from frontend.responses import WebJsonResponse
 from printers.schemas import (
     PrinterShortSchema,
@@ -174,10 +174,11 @@ async def web_create_printer(
     port: int = Form(),
     driver_name: str = Form(),
     description: str = Form(),
+    profile: dict = Depends(device_profile_form),
     session: AsyncSession = Depends(get_async_session),
 ) -> RedirectResponse | HTMLResponse:
     """Создаем принтер на основании значений полей формы."""
-    printer_id: int | None = await printers_service.create(session, ip, port, driver_name, description)
+    printer_id: int | None = await printers_service.create(session, ip, port, driver_name, description, profile)
 
     # При некорректно введенных данных рендерим страницу повторно и выдаем плашку из данных контекста
     if not printer_id:
@@ -232,10 +233,12 @@ async def web_update_printer(
     port: int = Form(),
     driver_name: str = Form(),
     description: str = Form(),
+    profile: dict = Depends(device_profile_form),
     session: AsyncSession = Depends(get_async_session),
 ) -> RedirectResponse | HTMLResponse:
     """Сохраняем изменения данных принтера на основании значений полей формы."""
-    updated_printer_id: int | None = await printers_service.update(session, printer_id, ip, port, driver_name, description)
+    updated_printer_id: int | None = await printers_service.update(
+        session, printer_id, ip, port, driver_name, description, profile)
 
     # При некорректно введенных данных рендерим страницу повторно и выдаем плашку из данных контекста
     if not updated_printer_id:
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings as s
+from core.database import get_async_session
+from scales.archive import ArchiveResolutions
+from scales.schemas import ScalesArchiveSchema, ScalesHistorySchema, ScalesSnapshotRequestSchema, ScalesSnapshotSchema
+from scales.service import scales_service
+
+api_scales_router = APIRouter()
+
+
+@api_scales_router.post(
+    '/snapshot', response_model=list[ScalesSnapshotSchema], summary='Получить текущий вес с нескольких весов')
+async def get_weight_snapshot(
+    request: ScalesSnapshotRequestSchema,
+    force: bool = Query(False),
+    session: AsyncSession = Depends(get_async_session)
+) -> list[ScalesSnapshotSchema]:
+    """Эндпоинт одновременного опроса весов по списку id или всех весов ('all').
+
+    force - читать вес с весов напрямую, минуя кэш фонового мониторинга.
+    """
+    scales_ids = None if request.scales_ids == 'all' else request.scales_ids
+    snapshot = await scales_service.get_weight_snapshot(session, scales_ids, force)
+    return snapshot
+
+
+@api_scales_router.get(
+    '/{scales_id}/history', response_model=ScalesHistorySchema, summary='Получить последние показания весов')
+async def get_history(
+    scales_id: int,
+    seconds: float = Query(60, gt=0, le=s.SCALES_HISTORY_MAX_SECONDS),
+    session: AsyncSession = Depends(get_async_session)
+) -> ScalesHistorySchema:
+    """Эндпоинт получения показаний весов за последние seconds секунд из кольцевого буфера истории."""
+    history = await scales_service.get_history(session, scales_id, seconds)
+    return history
+
+
+@api_scales_router.get(
+    '/{scales_id}/archive', response_model=ScalesArchiveSchema, summary='Получить показания весов из архива')
+async def get_archive(
+    scales_id: int,
+    start: datetime | None = Query(None),
+    end: datetime | None = Query(None),
+    resolution: ArchiveResolutions = Query(ArchiveResolutions.minute),
+    session: AsyncSession = Depends(get_async_session)
+) -> ScalesArchiveSchema:
+    """Эндпоинт получения показаний весов из архива на диске за [start, end).
+
+    По умолчанию - последний час. resolution: raw - все показания, second/minute - сводки min/max/mean за секунду/минуту.
+    """
+    end = end or datetime.now()
+    start = start or end - timedelta(hours=1)
+    archive = await scales_service.get_archive(session, scales_id, start, end, resolution)
+    return archive
@@ -0,0 +1,332 @@
+import asyncio
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta
+from enum import StrEnum
+from pathlib import Path
+
+import numpy as np
+
+from core.config import settings as s
+from core.log import logger
+
+from device_drivers.validators import ScalesResponse
+
+
+class ArchiveResolutions(StrEnum):
+    """Разрешение выборки из архива показаний: все показания, сводки за секунду, сводки за минуту."""
+    raw = 'raw'
+    second = 'second'
+    minute = 'minute'
+
+
+RAW_COLUMNS: dict[str, np.dtype] = {
+    'timestamp': np.dtype('<f8'),
+    'weight': np.dtype('<f8'),
+    'stable': np.dtype('u1'),
+}
+
+ROLLUP_COLUMNS: dict[str, np.dtype] = {
+    'timestamp': np.dtype('<f8'),
+    'min': np.dtype('<f8'),
+    'max': np.dtype('<f8'),
+    'mean': np.dtype('<f8'),
+    'count': np.dtype('<u4'),
+}
+
+ROLLUP_SECONDS: dict[ArchiveResolutions, int] = {
+    ArchiveResolutions.second: 1,
+    ArchiveResolutions.minute: 60,
+}
+
+
+class ColumnarSeries:
+    """Ряд записей фиксированной ширины за одни сутки: по файлу на столбец, запись только в конец.
+
+    Чтение идет через mmap: по столбцу времени бинарным поиском находится диапазон записей,
+    из файлов столбцов копируется только он. Число записей определяется по самому короткому столбцу,
+    поэтому запись, оборванная аварийной остановкой или нехваткой места, не читается, а перед следующей
+    дозаписью отрезается: иначе записи в более длинных столбцах сдвинулись бы относительно остальных.
+    """
+    def __init__(self, directory: Path, columns: dict[str, np.dtype]) -> None:
+        self.directory = directory
+        self.columns = columns
+
+    def _path(self, column: str) -> Path:
+        """Путь к файлу столбца, расширение - тип значений (f8, u1, ...)."""
+        return self.directory / f'{column}.{self.columns[column].str.lstrip("<|")}'
+
+    def __len__(self) -> int:
+        rows = []
+        for column, dtype in self.columns.items():
+            path = self._path(column)
+            rows.append(path.stat().st_size // dtype.itemsize if path.exists() else 0)
+
+        return min(rows)
+
+    def append(self, data: dict[str, np.ndarray]) -> None:
+        """Дописываем записи в конец файлов столбцов, предварительно отрезав хвосты оборванной записи."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        rows = len(self)
+
+        for column, dtype in self.columns.items():
+            with open(self._path(column), 'ab') as file:
+                file.truncate(rows * dtype.itemsize)
+                file.write(np.ascontiguousarray(data[column], dtype=dtype).tobytes())
+
+    def read(self, start: float, end: float) -> dict[str, np.ndarray]:
+        """Возвращаем записи со временем в диапазоне [start, end)."""
+        rows = len(self)
+        if not rows:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in self.columns.items()}
+
+        timestamps = np.memmap(self._path('timestamp'), dtype=self.columns['timestamp'], mode='r', shape=(rows,))
+        first, last = np.searchsorted(timestamps, [start, end], side='left')
+        del timestamps
+
+        result = {}
+        for column, dtype in self.columns.items():
+            values = np.memmap(self._path(column), dtype=dtype, mode='r', shape=(rows,))
+            result[column] = np.array(values[first:last])
+            del values
+
+        return result
+
+
+class RollupAccumulator:
+    """Сводка показаний (min, max, mean, count) по интервалам resolution секунд.
+
+    Последний интервал остается открытым, пока не придет показание следующего интервала
+    или пока интервал не истечет по часам (close_expired).
+    """
+    def __init__(self, resolution: int) -> None:
+        self.resolution = resolution
+        # Открытый интервал: начало, минимум, максимум, сумма, число показаний
+        self._open: tuple[float, float, float, float, int] | None = None
+
+    def add(self, timestamps: np.ndarray, weights: np.ndarray) -> dict[str, np.ndarray]:
+        """Учитываем пачку показаний, возвращаем закрытые интервалы."""
+        if not len(timestamps):
+            return self._rollups([])
+
+        keys = np.floor(timestamps / self.resolution) * self.resolution
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+        buckets = list(zip(
+            keys[starts].tolist(),
+            np.minimum.reduceat(weights, starts).tolist(),
+            np.maximum.reduceat(weights, starts).tolist(),
+            np.add.reduceat(weights, starts).tolist(),
+            np.diff(np.r_[starts, len(weights)]).tolist(),
+        ))
+
+        if self._open is not None:
+            if self._open[0] == buckets[0][0]:
+                opened, first = self._open, buckets[0]
+                buckets[0] = (
+                    first[0], min(opened[1], first[1]), max(opened[2], first[2]), opened[3] + first[3], opened[4] + first[4])
+            else:
+                buckets.insert(0, self._open)
+
+        self._open = buckets.pop()
+        return self._rollups(buckets)
+
+    def close_expired(self, now: float) -> dict[str, np.ndarray]:
+        """Закрываем открытый интервал, если он истек."""
+        if self._open is None or self._open[0] + self.resolution > now:
+            return self._rollups([])
+
+        closed, self._open = self._open, None
+        return self._rollups([closed])
+
+    @staticmethod
+    def _rollups(buckets: list[tuple[float, float, float, float, int]]) -> dict[str, np.ndarray]:
+        """Переводим интервалы в столбцы записей сводки."""
+        columns = np.array(buckets, dtype=np.float64).reshape(-1, 5)
+
+        return {
+            'timestamp': columns[:, 0],
+            'min': columns[:, 1],
+            'max': columns[:, 2],
+            'mean': columns[:, 3] / np.maximum(columns[:, 4], 1),
+            'count': columns[:, 4],
+        }
+
+
+class ScalesArchiveWriter:
+    """Запись показаний одних весов в суточные ряды: все показания и сводки за секунду и за минуту."""
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.rollups = {resolution: RollupAccumulator(seconds) for resolution, seconds in ROLLUP_SECONDS.items()}
+
+    def write(self, readings: np.ndarray, now: float) -> None:
+        """Записываем пачку показаний (столбцы timestamp, weight, stable) и закрытые интервалы сводок."""
+        timestamps = readings[:, 0]
+        self._append(ArchiveResolutions.raw, RAW_COLUMNS, {
+            'timestamp': timestamps,
+            'weight': readings[:, 1],
+            'stable': readings[:, 2],
+        })
+
+        for resolution, accumulator in self.rollups.items():
+            closed = accumulator.add(timestamps, readings[:, 1])
+            self._append(resolution, ROLLUP_COLUMNS, closed)
+            self._append(resolution, ROLLUP_COLUMNS, accumulator.close_expired(now))
+
+    def close(self) -> None:
+        """Записываем открытые интервалы сводок."""
+        for resolution, accumulator in self.rollups.items():
+            self._append(resolution, ROLLUP_COLUMNS, accumulator.close_expired(float('inf')))
+
+    def _append(self, resolution: ArchiveResolutions, columns: dict[str, np.dtype], data: dict[str, np.ndarray]) -> None:
+        """Дописываем записи в ряды по суткам их времени (пачка может прийтись на смену суток)."""
+        timestamps = data['timestamp']
+        if not len(timestamps):
+            return
+
+        days = [date.fromtimestamp(timestamp) for timestamp in timestamps.tolist()]
+        day_starts = [0] + [i for i in range(1, len(days)) if days[i] != days[i - 1]] + [len(days)]
+
+        for first, last in zip(day_starts, day_starts[1:]):
+            series = ColumnarSeries(self.directory / days[first].isoformat() / resolution, columns)
+            series.append({column: values[first:last] for column, values in data.items()})
+
+
+class ScalesArchive:
+    """Архив показаний весов на диске для разбора спорных ситуаций: дни истории без нагрузки на БД.
+
+    По весам - каталог с подкаталогами суток, в них - ряды всех показаний и сводок за секунду и минуту
+    (ColumnarSeries). Поток веса хаба только складывает показание в память (record), на диск пачки
+    пишутся фоновой задачей раз в s.SCALES_ARCHIVE_FLUSH_INTERVAL секунд в отдельном потоке,
+    не задерживая цикл событий. Каталоги суток старше s.SCALES_ARCHIVE_RETENTION_DAYS удаляются.
+    """
+    def __init__(self, root: str = s.SCALES_ARCHIVE_DIR_PATH) -> None:
+        self.root = Path(root)
+        self._pending: dict[tuple[str, int, int | None], list[tuple[float, float, bool]]] = {}
+        self._writers: dict[tuple[str, int, int | None], ScalesArchiveWriter] = {}
+        self._task: asyncio.Task | None = None
+        self._purged_on: date | None = None
+        # Запись на диск идет в отдельном потоке; пачки пишутся строго по очереди
+        self._flush_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Запись архива запущена."""
+        return self._task is not None
+
+    def record(self, host: str, port: int, address: int | None, response: ScalesResponse) -> None:
+        """Запоминаем показание для записи на диск."""
+        if self._task is None:
+            return
+
+        self._pending.setdefault((host, port, address), []).append((time.time(), response.weight, response.stable))
+
+    def start(self) -> None:
+        """Запускаем фоновую запись архива."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f'🗄  Запущена запись архива показаний весов в {self.root.resolve()}')
+
+    async def stop(self) -> None:
+        """Останавливаем запись, дописываем накопленные показания и открытые интервалы сводок."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        await asyncio.to_thread(self._flush, *self._take_pending(), close=True)
+
+    async def query(
+        self, host: str, port: int, address: int | None, start: datetime, end: datetime,
+        resolution: ArchiveResolutions = ArchiveResolutions.minute, limit: int = s.SCALES_ARCHIVE_MAX_POINTS,
+    ) -> dict[str, np.ndarray]:
+        """Возвращаем записи архива весов за [start, end) в хронологическом порядке, не больше limit."""
+        return await asyncio.to_thread(self._query, host, port, address, start, end, resolution, limit)
+
+    def _query(
+        self, host: str, port: int, address: int | None, start: datetime, end: datetime,
+        resolution: ArchiveResolutions, limit: int,
+    ) -> dict[str, np.ndarray]:
+        """Читаем записи архива по суткам диапазона. Выполняется в отдельном потоке."""
+        columns = RAW_COLUMNS if resolution == ArchiveResolutions.raw else ROLLUP_COLUMNS
+        parts: list[dict[str, np.ndarray]] = []
+        rows = 0
+
+        day = start.date()
+        while day <= end.date() and rows < limit:
+            series = ColumnarSeries(self._directory((host, port, address)) / day.isoformat() / resolution, columns)
+            part = series.read(start.timestamp(), end.timestamp())
+            part = {column: values[:limit - rows] for column, values in part.items()}
+            parts.append(part)
+            rows += len(part['timestamp'])
+            day += timedelta(days=1)
+
+        return {
+            column: np.concatenate([part[column] for part in parts]) if parts else np.empty(0, dtype=dtype)
+            for column, dtype in columns.items()
+        }
+
+    def _directory(self, device_key: tuple[str, int, int | None]) -> Path:
+        """Каталог архива весов."""
+        host, port, address = device_key
+        return self.root / (f'{host}_{port}' if address is None else f'{host}_{port}_{address}')
+
+    def _take_pending(self) -> tuple[dict[tuple[str, int, int | None], np.ndarray], float]:
+        """Забираем накопленные показания, поток веса продолжает складывать новые в пустой буфер.
+
+        Вместе с пачкой возвращаем момент ее отбора: все показания, которые придут позже, не раньше него,
+        поэтому интервалы сводок, истекшие к этому моменту, можно закрывать.
+        """
+        pending, self._pending = self._pending, {}
+        now = time.time()
+        return {device_key: np.array(readings, dtype=np.float64) for device_key, readings in pending.items()}, now
+
+    async def _run(self) -> None:
+        """Периодически пишем накопленные показания на диск."""
+        while True:
+            await asyncio.sleep(s.SCALES_ARCHIVE_FLUSH_INTERVAL)
+
+            try:
+                await asyncio.to_thread(self._flush, *self._take_pending())
+            except Exception as e:
+                logger.error(f'❌  Ошибка записи архива показаний весов: {str(e)}')
+
+    def _flush(self, pending: dict[tuple[str, int, int | None], np.ndarray], now: float, close: bool = False) -> None:
+        """Пишем пачки показаний всех весов на диск, now - момент отбора пачки. Выполняется в отдельном потоке."""
+        with self._flush_lock:
+            for device_key, readings in pending.items():
+                writer = self._writers.get(device_key)
+                if writer is None:
+                    writer = self._writers[device_key] = ScalesArchiveWriter(self._directory(device_key))
+                writer.write(readings, now)
+
+            for device_key, writer in self._writers.items():
+                if device_key not in pending:
+                    writer.write(np.empty((0, 3)), now)
+                if close:
+                    writer.close()
+
+            self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        """Раз в сутки удаляем каталоги суток старше срока хранения."""
+        today = date.today()
+        if self._purged_on == today or not self.root.exists():
+            return
+
+        self._purged_on = today
+        oldest = (today - timedelta(days=s.SCALES_ARCHIVE_RETENTION_DAYS)).isoformat()
+
+        for day_directory in self.root.glob('*/*'):
+            if day_directory.is_dir() and day_directory.name < oldest:
+                shutil.rmtree(day_directory, ignore_errors=True)
+                logger.info(f'🗄  Удален архив показаний весов {day_directory}')
+
+
+scales_archive = ScalesArchive()
@@ -0,0 +1,58 @@
+from enum import StrEnum
+
+from core.config import settings as s
+
+from device_drivers.validators import ScalesResponse
+
+from scales.schemas import WeighingEvents, WeighingEventSchema
+
+
+class CycleStates(StrEnum):
+    """Состояния цикла взвешивания."""
+    empty = 'empty'
+    loaded = 'loaded'
+    weighed = 'weighed'
+
+
+class WeighingCycleDetector:
+    """Определение цикла взвешивания по потоку показаний весов: пусто -> нагружено -> успокоилось -> разгружено.
+
+    На каждый товар выдается ровно одно событие weighed с успокоившимся весом. Следующее событие weighed
+    возможно только после разгрузки платформы (вес ниже empty_threshold): догрузка или замена товара
+    без разгрузки нового события не дает. Порог нагрузки load_threshold выше порога разгрузки,
+    поэтому колебания веса около нуля не порождают ложных циклов.
+    Состояние не сбрасывается при потере связи с весами: товар, взвешенный до обрыва, не взвешивается повторно.
+    """
+    def __init__(
+        self,
+        load_threshold: float = s.SCALES_CYCLE_LOAD_THRESHOLD,
+        empty_threshold: float = s.SCALES_EMPTY_THRESHOLD,
+    ) -> None:
+        self.load_threshold = load_threshold
+        self.empty_threshold = empty_threshold
+        self.state = CycleStates.empty
+
+    def update(self, response: ScalesResponse) -> WeighingEventSchema | None:
+        """Учитываем очередное показание, возвращаем событие цикла, если оно произошло."""
+        weight = response.weight
+
+        if self.state == CycleStates.empty:
+            if weight >= self.load_threshold:
+                self.state = CycleStates.loaded
+                return self._event(WeighingEvents.loaded, weight)
+            return None
+
+        if weight < self.empty_threshold:
+            self.state = CycleStates.empty
+            return self._event(WeighingEvents.unloaded, weight)
+
+        if self.state == CycleStates.loaded and response.stable and weight >= self.load_threshold:
+            self.state = CycleStates.weighed
+            return self._event(WeighingEvents.weighed, weight)
+
+        return None
+
+    @staticmethod
+    def _event(event: WeighingEvents, weight: float) -> WeighingEventSchema:
+        """Формируем событие цикла."""
+        return WeighingEventSchema(event=event, weight=weight)
@@ -0,0 +1,112 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.config import settings as s
+
+from device_drivers.validators import ScalesResponse
+
+
+@dataclass(frozen=True)
+class ReadingsWindow:
+    """Выборка показаний из кольцевого буфера в хронологическом порядке.
+
+    first_seq - порядковый номер первого показания выборки, у следующих номера идут подряд.
+    """
+    first_seq: int
+    timestamps: np.ndarray
+    weights: np.ndarray
+    stable: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class ReadingsRingBuffer:
+    """Кольцевой буфер последних size показаний одних весов.
+
+    Показания хранятся в трех массивах NumPy фиксированного размера (время, вес, признак успокоения),
+    память на весы постоянна: 17 байт на показание. Каждое показание получает порядковый номер (seq),
+    по которому клиент может запросить показания, пропущенные с момента последнего полученного.
+    """
+    def __init__(self, size: int = s.SCALES_HISTORY_SIZE) -> None:
+        self.size = size
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.weights = np.zeros(size, dtype=np.float64)
+        self.stable = np.zeros(size, dtype=np.bool_)
+        # Сколько показаний записано за все время; порядковый номер следующего показания
+        self.written = 0
+
+    def __len__(self) -> int:
+        return min(self.written, self.size)
+
+    def append(self, response: ScalesResponse, timestamp: float | None = None) -> int:
+        """Записываем показание поверх самого старого, возвращаем его порядковый номер."""
+        seq = self.written
+        index = seq % self.size
+
+        self.timestamps[index] = time.time() if timestamp is None else timestamp
+        self.weights[index] = response.weight
+        self.stable[index] = response.stable
+        self.written += 1
+
+        return seq
+
+    def since(self, seq: int) -> ReadingsWindow:
+        """Возвращаем показания с номерами больше seq (из тех, что еще хранятся в буфере)."""
+        first_seq = max(seq + 1, self.written - len(self), 0)
+        return self._slice(first_seq, self.written)
+
+    def window(self, seconds: float, now: float | None = None) -> ReadingsWindow:
+        """Возвращаем показания за последние seconds секунд."""
+        now = time.time() if now is None else now
+        readings = self._slice(self.written - len(self), self.written)
+
+        # Время показаний возрастает, первое показание окна ищем бинарным поиском
+        start = int(np.searchsorted(readings.timestamps, now - seconds, side='left'))
+
+        return ReadingsWindow(
+            first_seq=readings.first_seq + start,
+            timestamps=readings.timestamps[start:],
+            weights=readings.weights[start:],
+            stable=readings.stable[start:],
+        )
+
+    def _slice(self, first_seq: int, end_seq: int) -> ReadingsWindow:
+        """Копируем показания с номерами [first_seq, end_seq) в хронологическом порядке."""
+        indexes = np.arange(first_seq, max(end_seq, first_seq)) % self.size
+
+        return ReadingsWindow(
+            first_seq=first_seq,
+            timestamps=self.timestamps[indexes],
+            weights=self.weights[indexes],
+            stable=self.stable[indexes],
+        )
+
+
+class ScalesHistory:
+    """Реестр кольцевых буферов показаний по весам (host, port, address).
+
+    Буфер заполняется потоком веса хаба, пока весы кто-то читает (окно браузера, мониторинг),
+    и сохраняется после остановки потока: последние показания можно посмотреть и позже.
+    """
+    def __init__(self) -> None:
+        self._buffers: dict[tuple[str, int, int | None], ReadingsRingBuffer] = {}
+
+    def buffer(self, host: str, port: int, address: int | None = None) -> ReadingsRingBuffer:
+        """Возвращаем буфер весов, при необходимости создаем его."""
+        device_key = (host, port, address)
+
+        buffer = self._buffers.get(device_key)
+        if buffer is None:
+            buffer = self._buffers[device_key] = ReadingsRingBuffer()
+
+        return buffer
+
+    def get(self, host: str, port: int, address: int | None = None) -> ReadingsRingBuffer | None:
+        """Возвращаем буфер весов, если по ним были показания."""
+        return self._buffers.get((host, port, address))
+
+
+scales_history = ScalesHistory()
@@ -0,0 +1,381 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator
+
+from core.config import settings as s
+from core.log import logger
+
+from device_drivers.scales.scales_base import BaseScalesDriver
+from device_drivers.validators import DeviceResponse, ResponseTypes, ScalesResponse, StreamEvents
+
+from events.buffer import events_buffer
+from events.schemas import DeviceEventSchema
+
+from scales.archive import scales_archive
+from scales.cycle import WeighingCycleDetector
+from scales.history import ReadingsWindow, scales_history
+from scales.schemas import WeighingEventSchema
+from scales.stability import StabilityDetector
+
+
+class ScalesSubscriber:
+    """Подписчик потока веса (например, одно окно браузера).
+
+    Показания не копятся: подписчик хранит только последнее показание (conflation), поэтому медленный клиент
+    получает актуальный вес, а не очередь устаревших показаний, и не тормозит чтение весов.
+    Показание отдается, только если вес изменился не меньше чем на min_delta или изменился признак stable,
+    не чаще max_rate раз в секунду. Если вес не меняется, раз в heartbeat секунд повторяем последний ответ,
+    чтобы клиент видел, что поток жив.
+    Ошибки и события потока (reconnecting, resumed) не замещаются показаниями и не прореживаются:
+    они копятся в отдельной очереди и отдаются раньше показаний, в порядке поступления.
+    """
+    def __init__(
+        self,
+        min_delta: float = s.SCALES_STREAM_MIN_DELTA,
+        max_rate: float = s.SCALES_STREAM_MAX_RATE,
+        heartbeat: float = s.SCALES_STREAM_HEARTBEAT,
+    ) -> None:
+        self.min_delta = min_delta
+        self.min_interval = 1 / max_rate if max_rate > 0 else 0
+        self.heartbeat = heartbeat
+
+        self._latest: DeviceResponse | None = None
+        # Последнее показание еще не отправлено клиенту
+        self._pending = False
+        self._events: deque[DeviceResponse] = deque(maxlen=s.SCALES_STREAM_EVENTS_QUEUE_SIZE)
+        self._sent: DeviceResponse | None = None
+        self._sent_at: float = 0.0
+        self._updated = asyncio.Event()
+
+    def put(self, response: DeviceResponse) -> None:
+        """Запоминаем ответ: событие или ошибку - в очередь, показание - вместо предыдущего неотправленного."""
+        if response.is_stream_event:
+            self._events.append(response)
+        else:
+            self._latest = response
+            self._pending = True
+        self._updated.set()
+
+    def select_missed(self, missed: ReadingsWindow) -> list[int]:
+        """Отбираем из пропущенных показаний (смещения в выборке) те, что подписчик отправил бы в живом потоке.
+
+        Применяются те же фильтр по изменению веса и ограничение частоты: показание, пришедшее раньше,
+        чем разрешает частота, замещается более свежим, а последнее значимое показание отдается всегда.
+        """
+        selected: list[int] = []
+        pending: int | None = None
+        sent_weight = sent_stable = None
+        sent_at = float('-inf')
+
+        for offset, (timestamp, weight, stable) in enumerate(
+            zip(missed.timestamps.tolist(), missed.weights.tolist(), missed.stable.tolist())
+        ):
+            if pending is not None and timestamp >= sent_at + self.min_interval:
+                selected.append(pending)
+                sent_weight, sent_stable = missed.weights[pending], missed.stable[pending]
+                sent_at = sent_at + self.min_interval
+                pending = None
+
+            if sent_weight is not None and abs(weight - sent_weight) < self.min_delta and stable == sent_stable:
+                continue
+
+            if timestamp >= sent_at + self.min_interval:
+                selected.append(offset)
+                sent_weight, sent_stable, sent_at = weight, stable, timestamp
+            else:
+                pending = offset
+
+        if pending is not None:
+            selected.append(pending)
+
+        return selected
+
+    def _is_significant(self, response: DeviceResponse) -> bool:
+        """Проверяем, стоит ли отправлять показание клиенту."""
+        sent = self._sent
+
+        if sent is None or sent.is_stream_event:
+            return True
+
+        if not isinstance(response.data, ScalesResponse) or not isinstance(sent.data, ScalesResponse):
+            return response != sent
+
+        return (
+            abs(response.data.weight - sent.data.weight) >= self.min_delta
+            or response.data.stable != sent.data.stable
+        )
+
+    async def get(self) -> DeviceResponse:
+        """Ждем очередной ответ весов, который нужно отправить клиенту."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if self._events:
+                return self._mark_sent(self._events.popleft())
+
+            time_to_heartbeat = self._sent_at + self.heartbeat - loop.time()
+
+            try:
+                async with asyncio.timeout(max(time_to_heartbeat, 0)):
+                    await self._updated.wait()
+            except TimeoutError:
+                # После события повторяем событие, иначе - самое свежее показание
+                heartbeat = self._sent if self._sent is not None and self._sent.is_stream_event else self._latest
+                if heartbeat is not None:
+                    return self._mark_sent(heartbeat)
+                self._sent_at = loop.time()
+                continue
+
+            # Флаг не сбрасываем, пока есть события: показание, пришедшее вместе с ними, отправится следом
+            if self._events:
+                continue
+
+            self._updated.clear()
+            if not self._pending or not self._is_significant(self._latest):
+                continue
+
+            # Ограничиваем частоту; пока ждем, показание может замениться более свежим
+            time_to_next_send = self._sent_at + self.min_interval - loop.time()
+            if time_to_next_send > 0:
+                await asyncio.sleep(time_to_next_send)
+                if self._events:
+                    self._updated.set()
+                    continue
+                self._updated.clear()
+
+            return self._mark_sent(self._latest)
+
+    def _mark_sent(self, response: DeviceResponse) -> DeviceResponse:
+        """Запоминаем отправленный клиенту ответ."""
+        if response is self._latest:
+            self._pending = False
+        self._sent = response
+        self._sent_at = asyncio.get_running_loop().time()
+        return response
+
+
+class ScalesStream:
+    """Поток веса одних весов: одна задача чтения на всех подписчиков.
+
+    Если включено определение успокоения на сервере, признак stable в показаниях
+    заменяется решением StabilityDetector по скользящему окну показаний.
+    По показаниям определяется цикл взвешивания (WeighingCycleDetector), события цикла раздаются
+    подписчикам событий: детектор один на поток, поэтому все подписчики получают одни и те же события.
+    Каждое показание записывается в кольцевой буфер истории весов (scales_history) и в архив на диске (scales_archive).
+    address - адрес весов на линии, если за одним шлюзом несколько весов.
+    """
+    def __init__(self, driver: BaseScalesDriver, host: str, port: int, address: int | None = None) -> None:
+        self.driver = driver
+        self.host = host
+        self.port = port
+        self.address = address
+        self.name = f'{host}:{port}' if address is None else f'{host}:{port}#{address}'
+        self.subscribers: set[ScalesSubscriber] = set()
+        self.event_subscribers: set[asyncio.Queue[WeighingEventSchema]] = set()
+        self.last_response: DeviceResponse | None = None
+        self._task: asyncio.Task | None = None
+        self._stability: StabilityDetector | None = StabilityDetector() if s.SCALES_STABILITY_ENABLED else None
+        self._cycle = WeighingCycleDetector()
+        self.history = scales_history.buffer(host, port, address)
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Есть подписчики на показания или на события цикла."""
+        return bool(self.subscribers or self.event_subscribers)
+
+    def start(self) -> None:
+        """Запускаем чтение весов, если оно еще не запущено или завершилось (например, с ошибкой)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f'📡 Запущен поток веса {self.name}')
+
+    async def stop(self) -> None:
+        """Останавливаем чтение весов и освобождаем соединение."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+        logger.info(f'📡 Остановлен поток веса {self.name}')
+
+    async def _run(self) -> None:
+        """Читаем поток весов и раздаем каждый ответ всем подписчикам."""
+        try:
+            async with aclosing(self.driver.get_weight_stream(self.host, self.port, self.address)) as stream:
+                async for response in stream:
+                    self._publish(response)
+
+        except Exception as e:
+            logger.error(f'❌  Поток веса {self.name} завершился с ошибкой: {str(e)}')
+            self._publish(DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e)))
+
+    def _publish(self, response: DeviceResponse) -> None:
+        """Запоминаем ответ и раздаем его подписчикам."""
+        if self._stability is not None:
+            response = self._apply_stability(response)
+
+        if response.ok and isinstance(response.data, ScalesResponse):
+            # Номер в истории идет вместе с показанием: по нему клиент потока может запросить пропущенное
+            response = response.model_copy(update={'seq': self.history.append(response.data)})
+
+        self.last_response = response
+        for subscriber in self.subscribers:
+            subscriber.put(response)
+
+        if response.ok and isinstance(response.data, ScalesResponse):
+            scales_archive.record(self.host, self.port, self.address, response.data)
+
+            event = self._cycle.update(response.data)
+            if event is not None:
+                self._publish_event(event)
+
+    def _publish_event(self, event: WeighingEventSchema) -> None:
+        """Раздаем событие цикла подписчикам, при переполнении очереди подписчика теряется самое старое событие."""
+        logger.info(f'⚖️  Весы {self.name}: {event.event} {event.weight}')
+        events_buffer.put_nowait(DeviceEventSchema(
+            created_at=event.timestamp, event=event.event.value, ip=self.host, port=self.port, address=self.address,
+            weight=event.weight))
+
+        for queue in self.event_subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _apply_stability(self, response: DeviceResponse) -> DeviceResponse:
+        """Заменяем признак stable решением детектора успокоения."""
+        if response.event == StreamEvents.reconnecting:
+            self._stability.reset()
+            return response
+
+        if not isinstance(response.data, ScalesResponse):
+            return response
+
+        stable: bool = self._stability.update(time.monotonic(), response.data.weight)
+        return response.model_copy(update={'data': response.data.model_copy(update={'stable': stable})})
+
+
+class ScalesStreamHub:
+    """Хаб потоков веса: сколько бы клиентов ни смотрели одни весы, с весами работает один поток.
+
+    Поток запускается с первым подписчиком и останавливается, когда отписывается последний.
+    Новый подписчик сразу получает последнее показание, не дожидаясь следующего фрейма.
+    """
+    def __init__(self) -> None:
+        self._streams: dict[tuple[str, int, int | None], ScalesStream] = {}
+        self._locks: dict[tuple[str, int, int | None], asyncio.Lock] = {}
+        # Сколько задач держат или ждут блокировку весов: запись блокировки удаляется, когда их не осталось
+        self._lock_users: dict[tuple[str, int, int | None], int] = {}
+
+    @asynccontextmanager
+    async def subscribe(
+        self, driver: BaseScalesDriver, host: str, port: int, address: int | None = None, throttle: bool = True,
+    ) -> AsyncIterator[ScalesSubscriber]:
+        """Подписываемся на поток веса, на выходе из контекста отписываемся.
+
+        throttle=False - подписчик получает каждое показание, без фильтра по изменению веса и ограничения частоты
+        (например, для кэша последних показаний).
+        """
+        device_socket = (host, port, address)
+        subscriber = ScalesSubscriber() if throttle else ScalesSubscriber(min_delta=0, max_rate=0)
+
+        # Запуск и остановка потока одних весов не должны пересекаться: оба работают с одним соединением
+        async with self._device_lock(device_socket):
+            stream = self._get_stream(driver, host, port, address)
+            stream.subscribers.add(subscriber)
+            if stream.last_response is not None:
+                subscriber.put(stream.last_response)
+            stream.start()
+
+        try:
+            yield subscriber
+
+        finally:
+            async with self._device_lock(device_socket):
+                stream.subscribers.discard(subscriber)
+                await self._release_stream(stream)
+
+    @asynccontextmanager
+    async def subscribe_events(
+        self, driver: BaseScalesDriver, host: str, port: int, address: int | None = None,
+    ) -> AsyncIterator[asyncio.Queue[WeighingEventSchema]]:
+        """Подписываемся на события цикла взвешивания, на выходе из контекста отписываемся.
+
+        События не прореживаются: подписчик получает очередь, в которую попадает каждое событие.
+        """
+        device_socket = (host, port, address)
+        queue: asyncio.Queue[WeighingEventSchema] = asyncio.Queue(maxsize=s.SCALES_CYCLE_EVENTS_QUEUE_SIZE)
+
+        async with self._device_lock(device_socket):
+            stream = self._get_stream(driver, host, port, address)
+            stream.event_subscribers.add(queue)
+            stream.start()
+
+        try:
+            yield queue
+
+        finally:
+            async with self._device_lock(device_socket):
+                stream.event_subscribers.discard(queue)
+                await self._release_stream(stream)
+
+    @asynccontextmanager
+    async def _device_lock(self, device_socket: tuple[str, int, int | None]) -> AsyncIterator[None]:
+        """Захватываем блокировку весов.
+
+        Блокировка нужна только на время запуска и остановки потока: когда ее никто не держит и не ждет,
+        запись удаляется, чтобы словарь блокировок не рос с каждыми когда-либо открытыми весами.
+        """
+        lock = self._locks.setdefault(device_socket, asyncio.Lock())
+        self._lock_users[device_socket] = self._lock_users.get(device_socket, 0) + 1
+
+        try:
+            async with lock:
+                yield
+
+        finally:
+            self._lock_users[device_socket] -= 1
+            if not self._lock_users[device_socket]:
+                del self._lock_users[device_socket]
+                del self._locks[device_socket]
+
+    def _get_stream(self, driver: BaseScalesDriver, host: str, port: int, address: int | None) -> ScalesStream:
+        """Возвращаем поток весов, при необходимости создаем его. Вызывается под блокировкой весов."""
+        device_socket = (host, port, address)
+        stream = self._streams.get(device_socket)
+
+        if stream is None:
+            stream = ScalesStream(driver, host, port, address)
+            self._streams[device_socket] = stream
+
+        elif stream.driver is not driver:
+            logger.warning(f'⚠️  Поток веса {stream.name} уже читается другим драйвером, используем его')
+
+        return stream
+
+    async def _release_stream(self, stream: ScalesStream) -> None:
+        """Останавливаем поток, если у него не осталось подписчиков. Вызывается под блокировкой весов."""
+        if stream.has_subscribers:
+            return
+
+        device_socket = (stream.host, stream.port, stream.address)
+        if self._streams.get(device_socket) is stream:
+            del self._streams[device_socket]
+        await stream.stop()
+
+    async def stop_all(self) -> None:
+        """Останавливаем все потоки (например, при завершении сервера)."""
+        streams = list(self._streams.values())
+        self._streams.clear()
+
+        for stream in streams:
+            await stream.stop()
+
+
+scales_stream_hub = ScalesStreamHub()
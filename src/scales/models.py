@@ -3,20 +3,21 @@ from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.config import settings as s
-from core.database import AppBaseClass
+from core.database import AppBaseClass, DeviceProfileMixin
 
 from device_drivers.drivers import scales_drivers
 
 AVAILABLE_DRIVERS = scales_drivers.keys()
 
 
-class ScalesOrm(AppBaseClass):
+class ScalesOrm(DeviceProfileMixin, AppBaseClass):
     """Модель справочника весов."""
     __tablename__ = 'scales'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ip: Mapped[str] = mapped_column(INET, nullable=False, index=True)  # работает только с postgres
     port: Mapped[int] = mapped_column(Integer, nullable=False)
+    address: Mapped[int | None] = mapped_column(Integer, nullable=True)  # адрес на линии, для драйверов шины
     description: Mapped[str] = mapped_column(String(s.DEVICE_DESCRIPTION_MAX_LENGTH), nullable=False)
 
     driver_name: Mapped[str] = mapped_column(String(s.DRIVER_NAME_MAX_LENGTH), nullable=False)
@@ -24,6 +25,10 @@ class ScalesOrm(AppBaseClass):
     __table_args__ = (
         CheckConstraint(port >= s.DEVICE_PORT_MIN, name='check_port_min'),
         CheckConstraint(port <= s.DEVICE_PORT_MAX, name='check_port_max'),
+        CheckConstraint(
+            f'address BETWEEN {s.SCALES_ADDRESS_MIN} AND {s.SCALES_ADDRESS_MAX}',
+            name='check_address_range',
+        ),
         CheckConstraint(
             f"driver_name IN ({', '.join(repr(v) for v in AVAILABLE_DRIVERS)})",
             name='check_driver_name_valid',
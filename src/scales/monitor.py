@@ -0,0 +1,111 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from core.config import settings as s
+from core.log import logger
+
+from device_drivers.scales.scales_base import BaseScalesDriver
+from device_drivers.validators import ScalesResponse, StreamEvents
+
+from scales.hub import scales_stream_hub
+from scales.schemas import ScalesShortSchema
+
+
+@dataclass(frozen=True)
+class ScalesReading:
+    """Последнее показание весов и время его получения."""
+    data: ScalesResponse
+    received_at: datetime = field(default_factory=datetime.now)
+    monotonic_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        """Возраст показания, секунды."""
+        return time.monotonic() - self.monotonic_at
+
+
+class ScalesMonitor:
+    """Фоновый мониторинг весов: по каждым весам из справочника постоянно читается поток веса.
+
+    Последнее показание каждых весов хранится в кэше, разовые запросы веса получают его без обращения к весам.
+    Поток берется из хаба (scales_stream_hub), поэтому мониторинг и окна браузера, смотрящие те же весы,
+    работают через одно соединение. При потере связи с весами показание удаляется из кэша,
+    чтобы не отдавать устаревший вес.
+    """
+    def __init__(self) -> None:
+        self._readings: dict[tuple[str, int, int | None], ScalesReading] = {}
+        self._tasks: dict[tuple[str, int, int | None], tuple[str, asyncio.Task]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Мониторинг запущен."""
+        return bool(self._tasks)
+
+    def get(self, host: str, port: int, address: int | None = None, max_age: float = s.SCALES_MONITOR_MAX_AGE) -> ScalesReading | None:
+        """Возвращаем показание весов из кэша, если оно не старше max_age секунд."""
+        reading = self._readings.get((host, port, address))
+
+        if reading is None or reading.age() > max_age:
+            return None
+
+        return reading
+
+    async def sync(self, all_scales: list[ScalesShortSchema]) -> None:
+        """Приводим набор отслеживаемых весов в соответствие со справочником.
+
+        Мониторинг удаленных весов и весов со смененным драйвером останавливается, для новых - запускается.
+        """
+        wanted = {
+            (scales.ip.compressed, scales.port, scales.address): scales
+            for scales in all_scales
+        }
+
+        for device_key, (driver_name, task) in list(self._tasks.items()):
+            if device_key not in wanted or wanted[device_key].driver_name != driver_name:
+                await self._stop_task(device_key, task)
+
+        for device_key, scales in wanted.items():
+            if device_key not in self._tasks:
+                task = asyncio.create_task(self._watch(device_key, scales.driver))
+                self._tasks[device_key] = (scales.driver_name, task)
+
+        logger.info(f'🛰  Мониторинг весов: отслеживается {len(self._tasks)}')
+
+    async def stop(self) -> None:
+        """Останавливаем мониторинг всех весов."""
+        for device_key, (_, task) in list(self._tasks.items()):
+            await self._stop_task(device_key, task)
+
+    async def _stop_task(self, device_key: tuple[str, int, int | None], task: asyncio.Task) -> None:
+        """Останавливаем мониторинг одних весов."""
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        self._tasks.pop(device_key, None)
+        self._readings.pop(device_key, None)
+
+    async def _watch(self, device_key: tuple[str, int, int | None], driver: BaseScalesDriver) -> None:
+        """Читаем поток веса весов и запоминаем каждое показание."""
+        host, port, address = device_key
+
+        try:
+            async with scales_stream_hub.subscribe(driver, host, port, address, throttle=False) as subscriber:
+                while True:
+                    response = await subscriber.get()
+
+                    if response.ok and isinstance(response.data, ScalesResponse):
+                        self._readings[device_key] = ScalesReading(data=response.data)
+
+                    elif response.event == StreamEvents.reconnecting:
+                        self._readings.pop(device_key, None)
+
+        except Exception as e:
+            self._readings.pop(device_key, None)
+            logger.error(f'❌  Мониторинг весов {host}:{port} остановлен с ошибкой: {str(e)}')
+
+
+scales_monitor = ScalesMonitor()
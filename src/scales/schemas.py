@@ -1,10 +1,14 @@
+from datetime import datetime
+from enum import StrEnum
 from ipaddress import IPv4Address
-from typing import Annotated
-from pydantic import AfterValidator, BaseModel, ConfigDict, computed_field
+from typing import Annotated, Literal
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, computed_field
 
 from core.config import settings as s
 from device_drivers.drivers import scales_drivers
 from device_drivers.scales.scales_base import BaseScalesDriver
+from device_drivers.validators import DeviceProfileSchema, DeviceResponse
+from scales.archive import ArchiveResolutions
 
 
 def driver_name_validator(value: str) -> str:
@@ -20,6 +24,7 @@ class ScalesShortSchema(BaseModel):
     ip: IPv4Address
     port: int
     driver_name: Annotated[str, AfterValidator(driver_name_validator)]
+    address: int | None = Field(None, ge=s.SCALES_ADDRESS_MIN, le=s.SCALES_ADDRESS_MAX)
 
     model_config = ConfigDict(from_attributes=True,
                               exclude_computed_fields=True,
@@ -32,17 +37,82 @@ class ScalesShortSchema(BaseModel):
         return scales_drivers.get(self.driver_name)
 
 
-class ScalesReadWebSchema(ScalesShortSchema):
+class ScalesReadWebSchema(ScalesShortSchema, DeviceProfileSchema):
     """Модель представления записи весов для вывода в HTML."""
     id: int
     description: str
 
 
-class ScalesCreateUpdateWebSchema(BaseModel):
+class ScalesCreateUpdateWebSchema(DeviceProfileSchema):
     """Модель создания/изменения весов для вывода в API."""
     ip: IPv4Address
     port: int
+    address: int | None = Field(None, ge=s.SCALES_ADDRESS_MIN, le=s.SCALES_ADDRESS_MAX)
     description: str
     driver_name: Annotated[str, AfterValidator(driver_name_validator)]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ScalesSnapshotRequestSchema(BaseModel):
+    """Модель запроса снимка показаний весов: список id весов или 'all' - все весы."""
+    scales_ids: list[int] | Literal['all'] = 'all'
+
+
+class ScalesSnapshotSchema(BaseModel):
+    """Модель показания одних весов в снимке для вывода в API."""
+    id: int
+    description: str | None = None
+    ip: IPv4Address | None = None
+    port: int | None = None
+    address: int | None = None
+    response: DeviceResponse
+
+
+class WeighingEvents(StrEnum):
+    """События цикла взвешивания.
+
+    loaded - на пустую платформу положили груз
+    weighed - вес груза успокоился, weight - вес товара (одно событие на товар)
+    unloaded - платформу разгрузили, можно взвешивать следующий товар
+    """
+    loaded = 'loaded'
+    weighed = 'weighed'
+    unloaded = 'unloaded'
+
+
+class WeighingEventSchema(BaseModel):
+    """Модель события цикла взвешивания."""
+    event: WeighingEvents
+    weight: float
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+
+class ScalesHistorySchema(BaseModel):
+    """Модель истории показаний весов для вывода в API: показания в хронологическом порядке по столбцам.
+
+    first_seq - порядковый номер первого показания, у следующих номера идут подряд.
+    """
+    id: int
+    first_seq: int
+    timestamps: list[float]
+    weights: list[float]
+    stable: list[bool]
+
+
+class ScalesArchiveSchema(BaseModel):
+    """Модель выборки из архива показаний весов для вывода в API: записи по столбцам.
+
+    Для выборки всех показаний (raw) заполнены weights и stable, для сводок - mins, maxs, means и counts.
+    truncated - выборка ограничена максимальным числом записей, остальные записи диапазона не вошли.
+    """
+    id: int
+    resolution: ArchiveResolutions
+    timestamps: list[float]
+    weights: list[float] | None = None
+    stable: list[bool] | None = None
+    mins: list[float] | None = None
+    maxs: list[float] | None = None
+    means: list[float] | None = None
+    counts: list[int] | None = None
+    truncated: bool = False
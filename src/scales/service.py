@@ -1,4 +1,7 @@
-from typing import TypeVar
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, TypeVar
 
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import BaseModel, ValidationError
@@ -8,16 +11,26 @@ from core.config import settings as s
 from core.exceptions import ObjectNotFound
 
 from device_drivers.drivers import scales_drivers
-from device_drivers.validators import DeviceResponse, ResponseTypes
+from device_drivers.deadline import with_deadline
+from device_drivers.profiles import device_profiles
+from device_drivers.validators import DeviceResponse, ResponseTypes, ScalesResponse
 
 from frontend.websockets import ws_connection_manager
 from frontend.responses import WebJsonResponse
 
+from scales.archive import ArchiveResolutions, scales_archive
+from scales.history import ReadingsRingBuffer, scales_history
+from scales.hub import ScalesSubscriber, scales_stream_hub
+from scales.monitor import scales_monitor
 from scales.repository import scales_repo
 from scales.schemas import (
     ScalesShortSchema,
     ScalesReadWebSchema,
     ScalesCreateUpdateWebSchema,
+    ScalesArchiveSchema,
+    ScalesHistorySchema,
+    ScalesSnapshotSchema,
+    WeighingEventSchema,
 )
 
 T = TypeVar('T', bound=BaseModel)
@@ -71,63 +84,298 @@ class ScalesService:
 
         return context
 
-    async def create(self, session: AsyncSession, ip: str, port: int, driver_name: str, description: str) -> int | None:
+    async def create(
+        self, session: AsyncSession, ip: str, port: int, driver_name: str, description: str, profile: dict | None = None,
+        address: int | None = None,
+    ) -> int | None:
         """Создаем весы, возвращаем их id."""
         try:
             scales_dto = ScalesCreateUpdateWebSchema(
                 ip=ip,
                 port=port,
+                address=address,
                 driver_name=driver_name,
-                description=description)
+                description=description,
+                **(profile or {}))
         except ValidationError as e:
             from core.log import logger
             logger.debug(str(e))
             return None
 
         scales_id: int | None = await scales_repo.create(session, scales_dto)
+        await self.refresh(session)
 
         return scales_id
 
-    async def update(self, session: AsyncSession, scales_id: int, ip: str, port: int, driver_name: str, description: str) -> None:
+    async def update(
+        self, session: AsyncSession, scales_id: int, ip: str, port: int, driver_name: str, description: str,
+        profile: dict | None = None, address: int | None = None,
+    ) -> None:
         """Изменяем данные весов, ничего не возвращаем."""
         try:
             scales_dto = ScalesCreateUpdateWebSchema(
                 ip=ip,
                 port=port,
+                address=address,
                 driver_name=driver_name,
-                description=description)
+                description=description,
+                **(profile or {}))
         except ValidationError:
             return None
 
-        scales_id: int | None = await scales_repo.update(session, scales_id, scales_dto)
+        nullable_fields = {'address', *profile} if profile is not None else {'address'}
+        scales_id: int | None = await scales_repo.update(session, scales_id, scales_dto, nullable_fields=nullable_fields)
+        await self.refresh(session)
 
         return scales_id
 
     async def delete(self, session: AsyncSession, scales_id: int) -> None:
         """Удаляем весы, ничего не возвращаем."""
         await scales_repo.delete(session, scales_id)
+        await self.refresh(session)
 
-    async def get_weight(self, ip: str, port: int, driver_name: str) -> WebJsonResponse:
-        """Получаем вес с весов однократно."""
+    async def load_profiles(self, session: AsyncSession) -> None:
+        """Перезагружаем транспортные профили всех весов в реестр драйверов."""
+        device_profiles.load('scales', await self.get_all(session))
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Применяем изменения справочника весов: перезагружаем профили и набор весов фонового мониторинга."""
+        all_scales = await self.get_all(session)
+        device_profiles.load('scales', all_scales)
+
+        if s.SCALES_MONITOR_ENABLED:
+            await scales_monitor.sync(all_scales)
+
+    async def get_weight(
+        self, ip: str, port: int, driver_name: str, address: int | None = None, force: bool = False,
+    ) -> WebJsonResponse:
+        """Получаем вес с весов однократно.
+
+        Если включен фоновый мониторинг и у него есть достаточно свежее показание, отдаем его без обращения к весам.
+        force=True - всегда читаем вес с весов напрямую.
+        """
         try:
-            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name)
+            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name, address=address)
         except ValidationError as e:
             return WebJsonResponse(ok=False, message=str(e))
 
-        response: DeviceResponse = await scales.driver.get_weight(scales.ip.compressed, scales.port)
+        response: DeviceResponse = await self._read_weight(scales, force)
+
+        return WebJsonResponse(ok=response.ok, data=response.data, message=response.message)
+
+    async def get_weight_snapshot(
+        self, session: AsyncSession, scales_ids: list[int] | None = None, force: bool = False,
+    ) -> list[ScalesSnapshotSchema]:
+        """Получаем вес с нескольких весов одновременно (scales_ids=None - со всех весов).
+
+        Одновременно опрашивается не больше s.SCALES_SNAPSHOT_CONCURRENCY весов, у каждых весов свой
+        бюджет времени s.SCALES_SNAPSHOT_DEVICE_DEADLINE, отсчитываемый с начала их опроса:
+        медленные или недоступные весы получают ошибку, не задерживая остальные.
+        Ответы возвращаются в порядке запроса, для несуществующих id - ответ с ошибкой.
+        """
+        all_scales = {scales.id: scales for scales in await self.get_all(session)}
+        if scales_ids is None:
+            scales_ids = list(all_scales)
+
+        semaphore = asyncio.Semaphore(s.SCALES_SNAPSHOT_CONCURRENCY)
+
+        async def read(scales_id: int) -> ScalesSnapshotSchema:
+            scales = all_scales.get(scales_id)
+            if scales is None:
+                return ScalesSnapshotSchema(
+                    id=scales_id,
+                    response=DeviceResponse(ok=False, type=ResponseTypes.error, message=s.MESSAGE_ENTRY_DOESNT_EXIST))
+
+            async with semaphore:
+                response = await self._read_weight(scales, force, s.SCALES_SNAPSHOT_DEVICE_DEADLINE)
+
+            return ScalesSnapshotSchema(
+                id=scales.id, description=scales.description, ip=scales.ip, port=scales.port, address=scales.address,
+                response=response)
+
+        return list(await asyncio.gather(*(read(scales_id) for scales_id in scales_ids)))
+
+    async def get_history(self, session: AsyncSession, scales_id: int, seconds: float) -> ScalesHistorySchema:
+        """Возвращаем показания весов за последние seconds секунд из кольцевого буфера истории."""
+        scales: ScalesReadWebSchema = await self.get(session, scales_id)
+        buffer = scales_history.get(scales.ip.compressed, scales.port, scales.address)
+
+        if buffer is None:
+            return ScalesHistorySchema(id=scales.id, first_seq=0, timestamps=[], weights=[], stable=[])
+
+        window = buffer.window(seconds)
+        return ScalesHistorySchema(
+            id=scales.id,
+            first_seq=window.first_seq,
+            timestamps=window.timestamps.tolist(),
+            weights=window.weights.tolist(),
+            stable=window.stable.tolist(),
+        )
+
+    async def get_archive(
+        self, session: AsyncSession, scales_id: int, start: datetime, end: datetime, resolution: ArchiveResolutions,
+    ) -> ScalesArchiveSchema:
+        """Возвращаем показания весов за [start, end) из архива на диске: все показания или сводки."""
+        scales: ScalesReadWebSchema = await self.get(session, scales_id)
+        records = await scales_archive.query(
+            scales.ip.compressed, scales.port, scales.address, start, end, resolution, s.SCALES_ARCHIVE_MAX_POINTS)
+
+        columns = {'timestamps': records['timestamp'].tolist()}
+        if resolution == ArchiveResolutions.raw:
+            columns.update(weights=records['weight'].tolist(), stable=records['stable'].astype(bool).tolist())
+        else:
+            columns.update(
+                mins=records['min'].tolist(),
+                maxs=records['max'].tolist(),
+                means=records['mean'].tolist(),
+                counts=records['count'].tolist(),
+            )
+
+        return ScalesArchiveSchema(
+            id=scales.id,
+            resolution=resolution,
+            truncated=len(records['timestamp']) >= s.SCALES_ARCHIVE_MAX_POINTS,
+            **columns,
+        )
+
+    async def _read_weight(
+        self, scales: ScalesShortSchema, force: bool = False, deadline: float = s.DEVICE_REQUEST_DEADLINE,
+    ) -> DeviceResponse:
+        """Получаем вес с весов: из кэша фонового мониторинга, если он включен и показание свежее, иначе с весов."""
+        if s.SCALES_MONITOR_ENABLED and not force:
+            reading = scales_monitor.get(scales.ip.compressed, scales.port, scales.address)
+            if reading is not None:
+                return DeviceResponse(ok=True, type=ResponseTypes.data, data=reading.data)
+
+        try:
+            return await with_deadline(
+                scales.driver.get_weight(scales.ip.compressed, scales.port, scales.address), deadline)
 
-        return WebJsonResponse(ok=response.ok, data=response.data)
+        except Exception as e:
+            return DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e))
 
-    async def get_weight_stream(self, ip: str, port: int, driver_name: str, websocket: WebSocket) -> None:
-        """Получаем вес с весов в потоке. Используем объект-генератор."""
+    async def get_weight_stream(
+        self, ip: str, port: int, driver_name: str, websocket: WebSocket, address: int | None = None,
+    ) -> None:
+        """Получаем вес с весов в потоке.
+
+        Все клиенты, смотрящие одни весы, подписаны на общий поток хаба: с весами работает одно соединение.
+        При потере связи с весами поток не прерывается: клиент получает события reconnecting/resumed.
+        """
         await ws_connection_manager.connect(websocket)
 
         try:
-            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name)
+            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name, address=address)
+
+            async with scales_stream_hub.subscribe(
+                scales.driver, scales.ip.compressed, scales.port, scales.address
+            ) as subscriber:
+                while True:
+                    response: DeviceResponse = await subscriber.get()
+                    await ws_connection_manager.send_message(response.model_dump_json(exclude_none=True), websocket)
 
-            async for response in scales.driver.get_weight_stream(scales.ip.compressed, scales.port):
+        except (ValidationError, WebSocketDisconnect, Exception) as e:
+            response = DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e))
+            if not isinstance(e, WebSocketDisconnect):
                 await ws_connection_manager.send_message(response.model_dump_json(exclude_none=True), websocket)
 
+        finally:
+            await ws_connection_manager.disconnect(websocket)
+
+    @asynccontextmanager
+    async def weight_event_stream(
+        self, ip: str, port: int, driver_name: str, address: int | None = None, last_event_id: str | None = None,
+    ) -> AsyncIterator[AsyncIterator[str]]:
+        """Подписываемся на поток веса в формате Server-Sent Events, на выходе из контекста отписываемся.
+
+        Клиент подписан на общий поток хаба, как и клиенты websocket. Подписка принадлежит контексту,
+        а не генератору сообщений: она снимается сразу при завершении ответа, в том числе при отключении клиента.
+        """
+        try:
+            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name, address=address)
+        except ValidationError as e:
+            yield self._sse_error(str(e))
+            return
+
+        host, port, address = scales.ip.compressed, scales.port, scales.address
+
+        async with scales_stream_hub.subscribe(scales.driver, host, port, address) as subscriber:
+            yield self._sse_messages(subscriber, scales_history.buffer(host, port, address), last_event_id)
+
+    async def _sse_messages(
+        self, subscriber: ScalesSubscriber, history: ReadingsRingBuffer, last_event_id: str | None,
+    ) -> AsyncIterator[str]:
+        """Формируем сообщения Server-Sent Events из показаний подписчика.
+
+        id сообщения с показанием - порядковый номер показания в кольцевом буфере истории весов:
+        переподключившийся клиент (заголовок Last-Event-ID) сначала получает пропущенные показания из буфера,
+        прореженные так же, как живой поток подписчика, затем поток. Last-Event-ID, которого нет в этом процессе (перезапуск сервера, другой процесс), не учитывается.
+        Подписка оформлена до выборки из буфера: показания между выборкой и потоком не теряются.
+        Если сообщений нет дольше s.SCALES_SSE_KEEPALIVE секунд, отправляется комментарий keepalive,
+        чтобы прокси не закрыли простаивающее соединение.
+        """
+        yield f'retry: {s.SCALES_SSE_RETRY}\n\n'
+
+        sent_seq = -1
+        # Номера показаний свои у каждого процесса и начинаются заново после перезапуска сервера:
+        # номер больше последнего номера буфера выдан другим процессом, пропущенные показания не восстановить
+        if last_event_id is not None and last_event_id.isdigit() and int(last_event_id) < history.written:
+            missed = history.since(int(last_event_id))
+            for offset in subscriber.select_missed(missed):
+                response = DeviceResponse(
+                    ok=True, type=ResponseTypes.data,
+                    data=ScalesResponse(weight=float(missed.weights[offset]), stable=bool(missed.stable[offset])))
+                yield self._sse_message(response, missed.first_seq + offset)
+            sent_seq = missed.first_seq + len(missed) - 1
+
+        while True:
+            try:
+                async with asyncio.timeout(s.SCALES_SSE_KEEPALIVE):
+                    response: DeviceResponse = await subscriber.get()
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+
+            if response.seq is None:
+                yield self._sse_message(response)
+                continue
+
+            # Показания, уже отданные из буфера истории, не повторяем
+            if response.seq > sent_seq:
+                yield self._sse_message(response, response.seq)
+                sent_seq = response.seq
+
+    async def _sse_error(self, message: str) -> AsyncIterator[str]:
+        """Формируем единственное сообщение Server-Sent Events с ошибкой."""
+        yield f'retry: {s.SCALES_SSE_RETRY}\n\n'
+        yield self._sse_message(DeviceResponse(ok=False, type=ResponseTypes.error, message=message))
+
+    @staticmethod
+    def _sse_message(response: DeviceResponse, event_id: int | None = None) -> str:
+        """Формируем сообщение Server-Sent Events: JSON ответа весов в одной строке data."""
+        event_id_line = f'id: {event_id}\n' if event_id is not None and event_id >= 0 else ''
+        return f'{event_id_line}data: {response.model_dump_json(exclude_none=True)}\n\n'
+
+    async def get_weighing_events(
+        self, ip: str, port: int, driver_name: str, websocket: WebSocket, address: int | None = None,
+    ) -> None:
+        """Получаем события цикла взвешивания (loaded, weighed, unloaded) в потоке.
+
+        События определяются на сервере по общему потоку хаба: клиент получает несколько событий на товар
+        вместо каждого показания весов.
+        """
+        await ws_connection_manager.connect(websocket)
+
+        try:
+            scales = ScalesShortSchema(ip=ip, port=port, driver_name=driver_name, address=address)
+
+            async with scales_stream_hub.subscribe_events(
+                scales.driver, scales.ip.compressed, scales.port, scales.address
+            ) as events:
+                while True:
+                    event: WeighingEventSchema = await events.get()
+                    await ws_connection_manager.send_message(event.model_dump_json(), websocket)
+
         except (ValidationError, WebSocketDisconnect, Exception) as e:
             response = DeviceResponse(ok=False, type=ResponseTypes.error, message=str(e))
             if not isinstance(e, WebSocketDisconnect):
@@ -0,0 +1,108 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+from core.config import settings as s
+
+
+class StabilityDetector:
+    """Определение успокоения веса на стороне сервера по скользящему окну показаний.
+
+    Вес считается успокоившимся, если размах показаний за последние window секунд не превышает
+    tolerance делений шкалы и это условие держится не меньше dwell секунд.
+    Перед оценкой показания можно сгладить медианным фильтром по median_size последним показаниям
+    (отсекает одиночные выбросы).
+
+    Минимум и максимум окна ведутся монотонными очередями, поэтому обработка показания - O(1)
+    в среднем (медианный фильтр - O(median_size), размер фильтра мал и постоянен).
+    Показания из очередей удаляются по порядковому номеру, а не по времени: у нескольких показаний
+    время может совпадать.
+    """
+    def __init__(
+        self,
+        division: float = s.SCALES_DIVISION,
+        tolerance: int = s.SCALES_STABILITY_TOLERANCE_DIVISIONS,
+        window: float = s.SCALES_STABILITY_WINDOW,
+        dwell: float = s.SCALES_STABILITY_DWELL,
+        median_size: int = s.SCALES_STABILITY_MEDIAN_SIZE,
+    ) -> None:
+        if window <= 0:
+            raise ValueError(f'Окно определения успокоения должно быть больше нуля: {window}')
+
+        # Небольшой запас на погрешность представления дробных весов
+        self.band = division * tolerance + division * 1e-6
+        self.window = window
+        self.dwell = dwell
+        self.median_size = median_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Сбрасываем накопленные показания (например, после переподключения к весам)."""
+        # Показания окна: (порядковый номер, время); в монотонных очередях - (порядковый номер, вес)
+        self._samples: deque[tuple[int, float]] = deque()
+        self._maximums: deque[tuple[int, float]] = deque()
+        self._minimums: deque[tuple[int, float]] = deque()
+        self._count = 0
+        self._median_window: deque[float] = deque()
+        self._median_sorted: list[float] = []
+        self._band_since: float | None = None
+        self.weight: float | None = None
+        self.settled: bool = False
+
+    def _median(self, weight: float) -> float:
+        """Сглаживаем показание медианой по последним median_size показаниям."""
+        if self.median_size <= 1:
+            return weight
+
+        self._median_window.append(weight)
+        insort(self._median_sorted, weight)
+
+        if len(self._median_window) > self.median_size:
+            oldest = self._median_window.popleft()
+            del self._median_sorted[bisect_left(self._median_sorted, oldest)]
+
+        return self._median_sorted[len(self._median_sorted) // 2]
+
+    def update(self, timestamp: float, weight: float) -> bool:
+        """Учитываем очередное показание, возвращаем признак успокоения веса.
+
+        timestamp - монотонное время показания в секундах.
+        """
+        weight = self._median(weight)
+        self.weight = weight
+
+        index = self._count
+        self._count += 1
+        self._samples.append((index, timestamp))
+
+        # Монотонные очереди: в голове - максимум (минимум) окна
+        while self._maximums and self._maximums[-1][1] <= weight:
+            self._maximums.pop()
+        self._maximums.append((index, weight))
+
+        while self._minimums and self._minimums[-1][1] >= weight:
+            self._minimums.pop()
+        self._minimums.append((index, weight))
+
+        # Оставляем одно показание старше окна, чтобы знать, что окно заполнено целиком.
+        # Текущее показание не удаляется никогда, поэтому монотонные очереди не опустеют
+        window_start = timestamp - self.window
+        while len(self._samples) > 1 and self._samples[1][1] <= window_start:
+            expired_index, _ = self._samples.popleft()
+            while self._maximums[0][0] <= expired_index:
+                self._maximums.popleft()
+            while self._minimums[0][0] <= expired_index:
+                self._minimums.popleft()
+
+        window_filled = self._samples[0][1] <= window_start
+        in_band = window_filled and self._maximums[0][1] - self._minimums[0][1] <= self.band
+
+        if not in_band:
+            self._band_since = None
+            self.settled = False
+            return False
+
+        if self._band_since is None:
+            self._band_since = timestamp
+
+        self.settled = timestamp - self._band_since >= self.dwell
+        return self.settled
@@ -4,9 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import templates, settings as s
 from core.database import get_async_session
-from core.dependencies import logging_dependency
+from core.dependencies import device_profile_form, logging_dependency
 
-from frontend.responses import WebJsonResponse
+from frontend.responses import EventStreamResponse, WebJsonResponse
 from scales.service import scales_service
 
 scales_router = APIRouter()
@@ -24,9 +24,11 @@ async def web_scales_get_weight(
     ip: str = Form(),
     port: int = Form(),
     driver_name: str = Form(),
+    address: int | None = Form(None),
+    force: bool = Form(False),
 ) -> WebJsonResponse:
-    """Получаем вес с весов для вывода в интерфейсе."""
-    return await scales_service.get_weight(ip, port, driver_name)
+    """Получаем вес с весов для вывода в интерфейсе (force - читать с весов напрямую, минуя кэш мониторинга)."""
+    return await scales_service.get_weight(ip, port, driver_name, address, force)
 
 
 @scales_router.websocket(
@@ -40,8 +42,45 @@ async def websocket_get_weight_stream(
     ip = websocket.query_params.get('ip')
     port = websocket.query_params.get('port')
     driver_name = websocket.query_params.get('driver_name')
+    address = websocket.query_params.get('address') or None
 
-    return await scales_service.get_weight_stream(ip, port, driver_name, websocket)
+    return await scales_service.get_weight_stream(ip, port, driver_name, websocket, address)
+
+
+@scales_router.get(
+        '/sse_get_weight_stream/',
+        response_class=EventStreamResponse,
+        name='sse_get_weight_stream',
+        summary='Поток веса с весов (Server-Sent Events)',
+)
+async def sse_get_weight_stream(
+    request: Request,
+    ip: str,
+    port: int,
+    driver_name: str,
+    address: int | None = None,
+) -> EventStreamResponse:
+    """Получаем вес с весов в потоке через Server-Sent Events (для клиентов, которым не нужен websocket)."""
+    return EventStreamResponse(
+        scales_service.weight_event_stream(ip, port, driver_name, address, request.headers.get('last-event-id')),
+        request,
+    )
+
+
+@scales_router.websocket(
+        '/ws_weighing_events/',
+        name='websocket_weighing_events',
+)
+async def websocket_weighing_events(
+    websocket: WebSocket,
+) -> None:
+    """Получаем события цикла взвешивания (одно событие weighed на товар)."""
+    ip = websocket.query_params.get('ip')
+    port = websocket.query_params.get('port')
+    driver_name = websocket.query_params.get('driver_name')
+    address = websocket.query_params.get('address') or None
+
+    return await scales_service.get_weighing_events(ip, port, driver_name, websocket, address)
 
 
 @scales_router.get(
@@ -98,10 +137,13 @@ async def web_create_scales(
     port: int = Form(),
     driver_name: str = Form(),
     description: str = Form(),
+    address: int | None = Form(None),
+    profile: dict = Depends(device_profile_form),
     session: AsyncSession = Depends(get_async_session),
 ) -> RedirectResponse | HTMLResponse:
     """Создаем весы на основании значений полей формы."""
-    scales_id: int | None = await scales_service.create(session, ip, port, driver_name, description)
+    scales_id: int | None = await scales_service.create(
+        session, ip, port, driver_name, description, profile, address)
 
     # При некорректно введенных данных рендерим страницу повторно и выдаем плашку из данных контекста
     if not scales_id:
@@ -156,10 +198,13 @@ async def web_update_scales(
     port: int = Form(),
     driver_name: str = Form(),
     description: str = Form(),
+    address: int | None = Form(None),
+    profile: dict = Depends(device_profile_form),
     session: AsyncSession = Depends(get_async_session),
 ) -> RedirectResponse | HTMLResponse:
     """Сохраняем изменения данных весов на основании значений полей формы."""
-    updated_scales_id: int | None = await scales_service.update(session, scales_id, ip, port, driver_name, description)
+    updated_scales_id: int | None = await scales_service.update(
+        session, scales_id, ip, port, driver_name, description, profile, address)
 
     # При некорректно введенных данных рендерим страницу повторно и выдаем плашку из данных контекста
     if not updated_scales_id: